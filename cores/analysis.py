@@ -55,13 +55,13 @@ async def analyze_stock(company_code: str = "000660", company_name: str = "SK하
         base_sections = ["price_volume_analysis", "investor_trading_analysis", "company_status", "company_overview", "news_analysis", "market_index_analysis"]
 
         # 4. Prefetch data to reduce MCP tool call overhead
-        from cores.data_prefetch import prefetch_kr_analysis_data
+        from cores.data_prefetch import prefetch_kr_analysis_data_async
         try:
             from datetime import timedelta
             ref_date_obj = datetime.strptime(reference_date, "%Y%m%d")
             max_years_calc = 1
             max_years_ago_calc = (ref_date_obj - timedelta(days=365*max_years_calc)).strftime("%Y%m%d")
-            prefetched = prefetch_kr_analysis_data(company_code, reference_date, max_years_ago_calc)
+            prefetched = await prefetch_kr_analysis_data_async(company_code, reference_date, max_years_ago_calc)
         except Exception as e:
             logger.warning(f"Data prefetch failed, falling back to MCP: {e}")
             prefetched = {}
@@ -5,52 +5,145 @@ Pre-fetches stock data by calling kospi_kosdaq MCP server's library functions di
 (not via MCP protocol), eliminating MCP tool call round-trips during analysis.
 
 Architecture:
-- Direct call: import kospi_kosdaq_stock_server module → call functions → Dict → markdown
+- Direct call: import kospi_kosdaq_stock_server module → call functions → Dict → markdown (no pandas)
 - MCP fallback: if import fails, agents use MCP tool calls as before (no prefetch)
 
 This mirrors the US module's pattern (us_data_client.py direct import).
 """
 
+import asyncio
+import functools
+import inspect
 import logging
-
-import pandas as pd
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
-def _dict_to_markdown(data: dict, title: str = "") -> str:
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Keep only the most recent N rows per prefetched table (0 disables the cap).
+# Agents only need recent price action; older rows cost tokens without adding signal.
+STOCK_PREFETCH_MAX_ROWS = _env_int("PRISM_PREFETCH_MAX_ROWS", 250)
+INDEX_PREFETCH_MAX_ROWS = _env_int("PRISM_PREFETCH_INDEX_MAX_ROWS", 120)
+
+# Index ticker → display name for prefetch titles
+_INDEX_NAMES = {"1001": "KOSPI", "2001": "KOSDAQ"}
+
+# Max memoized results per prefetch function (keyed by code/ticker + date range)
+_PREFETCH_CACHE_SIZE = 256
+_memoized_prefetchers = []
+
+
+def _memoize_prefetch(func):
+    """Memoize non-empty prefetch results per call arguments (LRU, thread-safe).
+
+    Only closed date ranges (end_date before today) are cached: a range ending today
+    still gains bars during the session, so long-lived callers must refetch it.
+    Empty results (errors, module unavailable) are not cached so later calls can retry.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        end_date = signature.bind(*args, **kwargs).arguments.get("end_date")
+        if not end_date or str(end_date).replace("-", "") >= datetime.now().strftime("%Y%m%d"):
+            return func(*args, **kwargs)
+
+        key = (args, tuple(sorted(kwargs.items())))
+        with lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+
+        value = func(*args, **kwargs)
+        if value:
+            with lock:
+                cache[key] = value
+                if len(cache) > _PREFETCH_CACHE_SIZE:
+                    cache.popitem(last=False)
+        return value
+
+    def cache_clear():
+        with lock:
+            cache.clear()
+
+    wrapper.cache_clear = cache_clear
+    _memoized_prefetchers.append(wrapper)
+    return wrapper
+
+
+def prefetch_clear_cache():
+    """Clear memoized prefetch results (e.g., between tests or trading days)."""
+    for prefetcher in _memoized_prefetchers:
+        prefetcher.cache_clear()
+
+
+def _dict_to_markdown(data: dict, title_fmt: str = "", *title_args, max_rows: int = 0) -> str:
     """Convert MCP server's dict response to markdown table string.
 
     The kospi_kosdaq MCP server functions return Dict[str, Any] with date keys.
-    This converts them back to DataFrame for markdown rendering.
+    The table is rendered straight from the dict (no pandas/tabulate); columns are
+    the union of row keys in first-seen order, with blank cells for missing values.
 
     Args:
         data: Date-keyed dict from MCP server functions (e.g., {"2026-02-09": {"Open": ..., ...}})
-        title: Optional title to prepend
+        title_fmt: Optional title format string to prepend (formatted only when data is non-empty)
+        *title_args: Positional arguments for title_fmt
+        max_rows: Keep only the last N rows (0 keeps all)
 
     Returns:
-        Markdown table string, or empty string if data is empty/error
+        Markdown table string, or empty string if data is empty
     """
-    if not data or "error" in data:
+    if not data:
         return ""
 
-    df = pd.DataFrame.from_dict(data, orient='index')
-    if df.empty:
+    items = list(data.items())
+    if 0 < max_rows < len(items):
+        items = items[-max_rows:]
+
+    rows = [row for _, row in items]
+    columns = list(rows[0].keys())
+    first_keys = rows[0].keys()
+    if any(row.keys() != first_keys for row in rows):
+        # Mixed schemas: extend columns with keys missing from the first row
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+    if not columns:
         return ""
 
-    df.index.name = "Date"
+    lines = [
+        "| Date | " + " | ".join(str(c) for c in columns) + " |",
+        "|" + "---|" * (len(columns) + 1),
+    ]
+    lines.extend(
+        f"| {date} | " + " | ".join(str(row.get(c, "")) for c in columns) + " |"
+        for date, row in items
+    )
+    table = "\n".join(lines)
 
-    result = ""
-    if title:
-        result += f"### {title}\n\n"
-
-    result += df.to_markdown(index=True) + "\n"
-    return result
+    if title_fmt:
+        return f"### {title_fmt.format(*title_args)}\n\n{table}\n"
+    return f"{table}\n"
 
 
+@functools.lru_cache(maxsize=1)
 def _get_mcp_server_module():
     """Import kospi_kosdaq_stock_server module for direct library calls.
 
+    The result (module or None) is resolved once per process.
+
     Returns:
         The kospi_kosdaq_stock_server module, or None if import fails
     """
@@ -62,75 +155,99 @@ def _get_mcp_server_module():
         return None
 
 
-def prefetch_stock_ohlcv(company_code: str, start_date: str, end_date: str) -> str:
+def _call_server(func_name: str, *args):
+    """Call a kospi_kosdaq server library function, normalizing failures to None.
+
+    Args:
+        func_name: Server function name (e.g., "get_stock_ohlcv")
+        *args: Positional arguments for the function
+
+    Returns:
+        Date-keyed response dict, or None if the module is unavailable or
+        the server returned an {"error": ...} response
+    """
+    server = _get_mcp_server_module()
+    if not server:
+        return None
+
+    data = getattr(server, func_name)(*args)
+    if not data or "error" in data:
+        return None
+    return data
+
+
+@_memoize_prefetch
+def prefetch_stock_ohlcv(company_code: str, start_date: str, end_date: str, max_rows: Optional[int] = None) -> str:
     """Prefetch stock OHLCV data via kospi_kosdaq MCP server library.
 
     Args:
         company_code: 6-digit stock code (e.g., "005930")
         start_date: Start date (YYYYMMDD)
         end_date: End date (YYYYMMDD)
+        max_rows: Most recent rows to keep (defaults to PRISM_PREFETCH_MAX_ROWS)
 
     Returns:
         Markdown formatted OHLCV data string, or empty string on error
     """
     try:
-        server = _get_mcp_server_module()
-        if not server:
-            return ""
-
-        data = server.get_stock_ohlcv(start_date, end_date, company_code)
+        data = _call_server("get_stock_ohlcv", start_date, end_date, company_code)
 
-        return _dict_to_markdown(data, f"Stock OHLCV: {company_code} ({start_date}~{end_date})")
+        return _dict_to_markdown(
+            data, "Stock OHLCV: {} ({}~{})", company_code, start_date, end_date,
+            max_rows=STOCK_PREFETCH_MAX_ROWS if max_rows is None else max_rows,
+        )
     except Exception as e:
         logger.error(f"Error prefetching OHLCV for {company_code}: {e}")
         return ""
 
 
-def prefetch_stock_trading_volume(company_code: str, start_date: str, end_date: str) -> str:
+@_memoize_prefetch
+def prefetch_stock_trading_volume(company_code: str, start_date: str, end_date: str, max_rows: Optional[int] = None) -> str:
     """Prefetch investor trading volume data via kospi_kosdaq MCP server library.
 
     Args:
         company_code: 6-digit stock code
         start_date: Start date (YYYYMMDD)
         end_date: End date (YYYYMMDD)
+        max_rows: Most recent rows to keep (defaults to PRISM_PREFETCH_MAX_ROWS)
 
     Returns:
         Markdown formatted trading volume data string, or empty string on error
     """
     try:
-        server = _get_mcp_server_module()
-        if not server:
-            return ""
-
-        data = server.get_stock_trading_volume(start_date, end_date, company_code)
+        data = _call_server("get_stock_trading_volume", start_date, end_date, company_code)
 
-        return _dict_to_markdown(data, f"Investor Trading Volume: {company_code} ({start_date}~{end_date})")
+        return _dict_to_markdown(
+            data, "Investor Trading Volume: {} ({}~{})", company_code, start_date, end_date,
+            max_rows=STOCK_PREFETCH_MAX_ROWS if max_rows is None else max_rows,
+        )
     except Exception as e:
         logger.error(f"Error prefetching trading volume for {company_code}: {e}")
         return ""
 
 
-def prefetch_index_ohlcv(index_ticker: str, start_date: str, end_date: str) -> str:
+@_memoize_prefetch
+def prefetch_index_ohlcv(index_ticker: str, start_date: str, end_date: str, max_rows: Optional[int] = None) -> str:
     """Prefetch market index OHLCV data via kospi_kosdaq MCP server library.
 
     Args:
         index_ticker: Index ticker ("1001" for KOSPI, "2001" for KOSDAQ)
         start_date: Start date (YYYYMMDD)
         end_date: End date (YYYYMMDD)
+        max_rows: Most recent rows to keep (defaults to PRISM_PREFETCH_INDEX_MAX_ROWS)
 
     Returns:
         Markdown formatted index data string, or empty string on error
     """
     try:
-        server = _get_mcp_server_module()
-        if not server:
-            return ""
+        index_name = _INDEX_NAMES.get(index_ticker, index_ticker)
 
-        index_name = "KOSPI" if index_ticker == "1001" else "KOSDAQ" if index_ticker == "2001" else index_ticker
+        data = _call_server("get_index_ohlcv", start_date, end_date, index_ticker)
 
-        data = server.get_index_ohlcv(start_date, end_date, index_ticker)
-
-        return _dict_to_markdown(data, f"{index_name} Index ({start_date}~{end_date})")
+        return _dict_to_markdown(
+            data, "{} Index ({}~{})", index_name, start_date, end_date,
+            max_rows=INDEX_PREFETCH_MAX_ROWS if max_rows is None else max_rows,
+        )
     except Exception as e:
         logger.error(f"Error prefetching index OHLCV for {index_ticker}: {e}")
         return ""
@@ -139,7 +256,8 @@ def prefetch_index_ohlcv(index_ticker: str, start_date: str, end_date: str) -> s
 def prefetch_kr_analysis_data(company_code: str, reference_date: str, max_years_ago: str) -> dict:
     """Prefetch all data needed for KR stock analysis agents.
 
-    Calls kospi_kosdaq MCP server's library functions directly (not via MCP protocol).
+    Calls kospi_kosdaq MCP server's library functions directly (not via MCP protocol),
+    running the four fetches concurrently in a thread pool.
     If the library is unavailable, returns empty dict and agents fall back to MCP tool calls.
 
     Args:
@@ -157,25 +275,99 @@ def prefetch_kr_analysis_data(company_code: str, reference_date: str, max_years_
     """
     result = {}
 
-    # 1. Stock OHLCV data
-    stock_ohlcv = prefetch_stock_ohlcv(company_code, max_years_ago, reference_date)
-    if stock_ohlcv:
-        result["stock_ohlcv"] = stock_ohlcv
-
-    # 2. Investor trading volume data
-    trading_volume = prefetch_stock_trading_volume(company_code, max_years_ago, reference_date)
-    if trading_volume:
-        result["trading_volume"] = trading_volume
-
-    # 3. KOSPI index data
-    kospi_index = prefetch_index_ohlcv("1001", max_years_ago, reference_date)
-    if kospi_index:
-        result["kospi_index"] = kospi_index
-
-    # 4. KOSDAQ index data
-    kosdaq_index = prefetch_index_ohlcv("2001", max_years_ago, reference_date)
-    if kosdaq_index:
-        result["kosdaq_index"] = kosdaq_index
+    # pykrx does blocking HTTP I/O (GIL released), so the four fetches overlap in threads
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {
+            executor.submit(prefetch_stock_ohlcv, company_code, max_years_ago, reference_date): "stock_ohlcv",
+            executor.submit(prefetch_stock_trading_volume, company_code, max_years_ago, reference_date): "trading_volume",
+            executor.submit(prefetch_index_ohlcv, "1001", max_years_ago, reference_date): "kospi_index",
+            executor.submit(prefetch_index_ohlcv, "2001", max_years_ago, reference_date): "kosdaq_index",
+        }
+        for future in as_completed(futures):
+            data = future.result()
+            if data:
+                result[futures[future]] = data
+
+    if result:
+        logger.info(f"Prefetched KR data for {company_code}: {list(result.keys())}")
+    else:
+        logger.warning(f"Failed to prefetch any KR data for {company_code}")
+
+    return result
+
+
+def prefetch_kr_analysis_data_batch(company_codes: list, reference_date: str, max_years_ago: str,
+                                    max_workers: int = 16) -> dict:
+    """Prefetch KR analysis data for several stocks in one shared thread pool.
+
+    KOSPI/KOSDAQ index data is identical for every stock, so it is fetched once
+    and shared across the batch.
+
+    Args:
+        company_codes: List of 6-digit stock codes
+        reference_date: Analysis reference date (YYYYMMDD)
+        max_years_ago: Start date for data collection (YYYYMMDD)
+        max_workers: Thread pool size
+
+    Returns:
+        {company_code: dict} with the same per-stock shape as prefetch_kr_analysis_data
+    """
+    results = {code: {} for code in company_codes}
+    if not results:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        index_futures = {
+            executor.submit(prefetch_index_ohlcv, "1001", max_years_ago, reference_date): "kospi_index",
+            executor.submit(prefetch_index_ohlcv, "2001", max_years_ago, reference_date): "kosdaq_index",
+        }
+        stock_futures = {}
+        for code in results:
+            stock_futures[executor.submit(prefetch_stock_ohlcv, code, max_years_ago, reference_date)] = (code, "stock_ohlcv")
+            stock_futures[executor.submit(prefetch_stock_trading_volume, code, max_years_ago, reference_date)] = (code, "trading_volume")
+
+        index_data = {}
+        for future in as_completed(index_futures):
+            data = future.result()
+            if data:
+                index_data[index_futures[future]] = data
+
+        for future in as_completed(stock_futures):
+            data = future.result()
+            if data:
+                code, key = stock_futures[future]
+                results[code][key] = data
+
+    for code, result in results.items():
+        result.update(index_data)
+        if not result:
+            logger.warning(f"Failed to prefetch any KR data for {code}")
+
+    logger.info(f"Prefetched KR data for {len(results)} stocks ({sum(1 for r in results.values() if r)} with data)")
+    return results
+
+
+async def prefetch_kr_analysis_data_async(company_code: str, reference_date: str, max_years_ago: str) -> dict:
+    """Async variant of prefetch_kr_analysis_data for callers already inside an event loop.
+
+    Runs the four library calls via asyncio.to_thread so the loop is not blocked.
+
+    Args:
+        company_code: 6-digit stock code
+        reference_date: Analysis reference date (YYYYMMDD)
+        max_years_ago: Start date for data collection (YYYYMMDD)
+
+    Returns:
+        Same dictionary shape as prefetch_kr_analysis_data
+    """
+    keys = ("stock_ohlcv", "trading_volume", "kospi_index", "kosdaq_index")
+    values = await asyncio.gather(
+        asyncio.to_thread(prefetch_stock_ohlcv, company_code, max_years_ago, reference_date),
+        asyncio.to_thread(prefetch_stock_trading_volume, company_code, max_years_ago, reference_date),
+        asyncio.to_thread(prefetch_index_ohlcv, "1001", max_years_ago, reference_date),
+        asyncio.to_thread(prefetch_index_ohlcv, "2001", max_years_ago, reference_date),
+    )
+    result = {key: value for key, value in zip(keys, values) if value}
 
     if result:
         logger.info(f"Prefetched KR data for {company_code}: {list(result.keys())}")
@@ -2,11 +2,7 @@
 
 from mcp_agent.agents.agent import Agent
 
-
-def create_crypto_trading_scenario_agent(language: str = "ko") -> Agent:
-    """Create crypto trading scenario generation agent."""
-    if language == "en":
-        instruction = """
+_SCENARIO_INSTRUCTION_EN = """
 You are a crypto swing-trading scenario analyst.
 
 System constraints:
@@ -43,8 +39,8 @@ Output JSON only:
   }
 }
 """
-    else:
-        instruction = """
+
+_SCENARIO_INSTRUCTION_KO = """
 당신은 코인 스윙 매매 시나리오 분석가입니다.
 
 시스템 제약:
@@ -81,10 +77,13 @@ Output JSON only:
   }
 }
 """
+
+
+def create_crypto_trading_scenario_agent(language: str = "ko") -> Agent:
+    """Create crypto trading scenario generation agent."""
+    instruction = _SCENARIO_INSTRUCTION_EN if language == "en" else _SCENARIO_INSTRUCTION_KO
     return Agent(
         name="crypto_trading_scenario_agent",
         instruction=instruction,
         server_names=["sqlite", "time"],
     )
-
-
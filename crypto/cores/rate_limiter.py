@@ -0,0 +1,115 @@
+"""Async request/token rate limiter for crypto LLM calls."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Tuple
+
+
+class AsyncRateLimiter:
+    """Sliding-window limiter over requests per minute (RPM) and tokens per minute (TPM).
+
+    `acquire()` waits until both budgets allow the call. `penalize()` pauses all
+    callers after a provider 429 (e.g., for the Retry-After duration).
+    A limit of 0 disables that dimension.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, window_seconds: float = 60.0):
+        self.rpm = max(0, int(rpm))
+        self.tpm = max(0, int(tpm))
+        self.window_seconds = window_seconds
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float):
+        while self._events and now - self._events[0][0] >= self.window_seconds:
+            _, tokens = self._events.popleft()
+            self._window_tokens -= tokens
+
+    async def acquire(self, tokens: int = 0):
+        # A single call larger than the whole TPM budget would otherwise wait forever.
+        tokens = min(max(0, int(tokens)), self.tpm) if self.tpm else 0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    rpm_ok = not self.rpm or len(self._events) < self.rpm
+                    tpm_ok = not self.tpm or self._window_tokens + tokens <= self.tpm
+                    if rpm_ok and tpm_ok:
+                        self._events.append((now, tokens))
+                        self._window_tokens += tokens
+                        return
+                    wait = self.window_seconds - (now - self._events[0][0]) if self._events else 0.0
+                await asyncio.sleep(max(wait, 0.05))
+
+    def penalize(self, seconds: float):
+        """Block new acquisitions for `seconds` (e.g., after HTTP 429)."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + max(0.0, seconds))
+
+
+class AdaptiveConcurrencyLimiter:
+    """Async concurrency cap that shrinks on rate limits and recovers on success.
+
+    Used as `async with limiter:`. A rate-limit error raised inside the block halves
+    the cap (floor 1); every `recovery_successes` clean exits raise it by one, back
+    up to `max_concurrency`.
+    """
+
+    def __init__(self, max_concurrency: int, recovery_successes: int = 10):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.recovery_successes = max(1, int(recovery_successes))
+        self.limit = self.max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self._in_flight -= 1
+            if exc is None:
+                self._successes += 1
+                if self._successes >= self.recovery_successes and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._successes = 0
+            elif is_rate_limit_error(exc):
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            self._cond.notify_all()
+        return False
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Detect provider rate-limit (HTTP 429) errors, including ones wrapped by the LLM client."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if type(error).__name__ == "RateLimitError":
+            return True
+        response: Any = getattr(error, "response", None)
+        for status in (getattr(error, "status_code", None), getattr(response, "status_code", None)):
+            if status == 429:
+                return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def retry_after_seconds(error: BaseException, default: float) -> float:
+    """Read Retry-After from an HTTP error response, if present."""
+    response: Any = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return max(float(headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return default
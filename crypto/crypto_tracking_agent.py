@@ -16,11 +16,13 @@ except ImportError:  # pragma: no cover - optional dependency
 load_dotenv()
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
+import re
 import sqlite3
-import traceback
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
@@ -29,14 +31,18 @@ from mcp_agent.workflows.llm.augmented_llm import RequestParams
 from mcp_agent.workflows.llm.augmented_llm_openai import OpenAIAugmentedLLM
 
 from crypto.cores.agents.trading_agents import create_crypto_trading_scenario_agent
+from crypto.cores.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    AsyncRateLimiter,
+    is_rate_limit_error,
+    retry_after_seconds,
+)
 from crypto.trading import PaperCryptoTrading
 from crypto.theme_classifier import classify_symbol_theme
 from crypto.tracking import (
-    add_theme_columns_if_missing,
+    add_missing_columns,
     create_crypto_indexes,
     create_crypto_tables,
-    get_crypto_holdings_count,
-    is_crypto_symbol_in_holdings,
 )
 
 logging.basicConfig(
@@ -50,7 +56,111 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+SCENARIO_MODEL = "gpt-5-nano"
+# Bump to invalidate cached scenarios on changes the prompt fingerprint cannot see (e.g. parsing).
+SCENARIO_PROMPT_VERSION = "v1"
+SCENARIO_CACHE_FEATURES = (
+    "current_price",
+    "ret_1_pct",
+    "ret_4_pct",
+    "volume_ratio_20",
+    "atr_pct",
+    "risk_reward_ratio",
+    "target_price",
+    "stop_loss_price",
+    "final_score",
+)
+
+
+CANDIDATE_PROMPT_TEMPLATE = """
+다음은 코인 후보 데이터입니다. 매매 시나리오 JSON을 생성하세요.
+
+[Candidate]
+- Symbol: {symbol}
+- Trigger: {trigger_type}
+- Current Price: {current_price}
+- 1h Return (%): {ret_1_pct}
+- 4h Return (%): {ret_4_pct}
+- Volume Ratio(20): {volume_ratio_20}
+- ATR (%): {atr_pct}
+- Phase1 Risk-Reward: {risk_reward_ratio}
+- Phase1 Target: {target_price}
+- Phase1 Stop: {stop_loss_price}
+- Phase1 Final Score: {final_score}
+- Theme: {theme}
+
+요구사항:
+- 보수적으로 판단.
+- decision은 반드시 entry/no_entry 중 하나.
+- 숫자 필드는 숫자만.
+"""
+CANDIDATE_PROMPT_FIELDS = SCENARIO_CACHE_FEATURES + ("theme",)
+
+
+# SQL statements shared across cycle methods (sqlite3 caches prepared statements by SQL text).
+
+SQL_SELECT_HOLDINGS = """
+SELECT symbol, asset_name, buy_price, buy_date, buy_ts, quantity, notional_usd, current_price,
+       scenario, target_price, stop_loss, trigger_type, timeframe, theme
+FROM crypto_holdings
+"""
+
+SQL_INSERT_HOLDING = """
+INSERT INTO crypto_holdings
+(symbol, asset_name, buy_price, buy_date, buy_ts, quantity, notional_usd, current_price,
+ last_updated, scenario, target_price, stop_loss, trigger_type, timeframe, theme)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_UPDATE_HOLDING = """
+UPDATE crypto_holdings
+SET current_price = ?, stop_loss = ?, scenario = ?, last_updated = ?
+WHERE symbol = ?
+"""
+
+SQL_DELETE_HOLDING = "DELETE FROM crypto_holdings WHERE symbol = ?"
+
+SQL_INSERT_HISTORY = """
+INSERT INTO crypto_trading_history
+(symbol, asset_name, buy_price, buy_date, quantity, notional_usd, sell_price, sell_date,
+ profit_rate, holding_hours, scenario, trigger_type, timeframe, theme)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# "+symbol" keeps the planner from scanning a symbol index for the GROUP BY, so the
+# sell_date index bounds the read to the cooldown window.
+SQL_SELECT_RECENT_SELLS = """
+SELECT symbol, MAX(sell_date)
+FROM crypto_trading_history
+WHERE sell_date >= ?
+GROUP BY +symbol
+"""
+
+SQL_INSERT_WATCHLIST = """
+INSERT INTO crypto_watchlist_history
+(symbol, analyzed_date, current_price, buy_score, min_score, decision, skip_reason,
+ target_price, stop_loss, risk_reward_ratio, trigger_type, timeframe, theme, scenario)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_SELECT_SCENARIO_CACHE = "SELECT scenario FROM crypto_scenario_cache WHERE cache_key = ? AND created_at >= ?"
+
+SQL_UPSERT_SCENARIO_CACHE = """
+INSERT OR REPLACE INTO crypto_scenario_cache (cache_key, symbol, scenario, created_at)
+VALUES (?, ?, ?, ?)
+"""
+
+SQL_PURGE_SCENARIO_CACHE = "DELETE FROM crypto_scenario_cache WHERE created_at < ?"
+
+# Exit reason markers used to bucket sells into rotation / stop_loss / normal.
+_ROTATION_EXIT_RE = re.compile(r"rotation replace:", re.IGNORECASE)
+_STOP_EXIT_RE = re.compile(r"stop loss|trailing stop|loss guard", re.IGNORECASE)
+
+
 def _safe_float(value: Any, default: float = 0.0) -> float:
+    # Most values (prices, scores, executions) are already floats.
+    if type(value) is float:
+        return value
     try:
         if value is None:
             return default
@@ -59,27 +169,54 @@ def _safe_float(value: Any, default: float = 0.0) -> float:
         return default
 
 
+def _extract_first_json_object(text: str, pos: int = 0) -> str | None:
+    """Return the first balanced {...} block at or after `pos`, ignoring braces inside JSON strings."""
+    depth = 0
+    start = -1
+    in_str = False
+    escaped = False
+    for i in range(pos, len(text)):
+        ch = text[i]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            if depth > 0:
+                in_str = True
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
 def _parse_json_object(text: str) -> Dict[str, Any]:
     """Best-effort JSON parser for LLM output."""
     if not text:
         return {}
-    stripped = text.strip()
-    if stripped.startswith("```"):
-        stripped = stripped.strip("`")
-        if stripped.startswith("json"):
-            stripped = stripped[4:].strip()
-    if stripped.startswith("{") and stripped.endswith("}"):
-        try:
-            return json.loads(stripped)
-        except Exception:
-            pass
-    start = stripped.find("{")
-    end = stripped.rfind("}")
-    if start >= 0 and end > start:
+    # Prose or code before the answer may hold its own brace blocks; skip any that do not parse.
+    pos = text.find("{")
+    while pos >= 0:
+        block = _extract_first_json_object(text, pos)
+        if block is None:
+            # Unbalanced from here (e.g. a stray "{" in prose); retry from the next brace.
+            pos = text.find("{", pos + 1)
+            continue
         try:
-            return json.loads(stripped[start : end + 1])
+            parsed = json.loads(block)
         except Exception:
-            pass
+            parsed = None
+        if isinstance(parsed, dict):
+            return parsed
+        pos = text.find("{", pos + len(block))
     return {}
 
 
@@ -91,6 +228,39 @@ def _parse_scenario_field(value: Any) -> Dict[str, Any]:
     return {}
 
 
+def _scenario_prompt_fingerprint(instruction: str) -> str:
+    """Short hash of the agent instruction and candidate prompt template."""
+    return hashlib.sha256(f"{instruction}\x00{CANDIDATE_PROMPT_TEMPLATE}".encode("utf-8")).hexdigest()[:16]
+
+
+def _scenario_cache_key(
+    symbol: str,
+    trigger_type: str,
+    candidate: Dict[str, Any],
+    language: str,
+    prompt_fingerprint: str,
+) -> str:
+    """Hash the prompt inputs, rounding features to 4 significant digits.
+
+    Language and prompt fingerprint are part of the key, so a "ko" agent never reuses
+    an "en" rationale and prompt edits stop hitting old rows.
+    """
+    features = [float(f"{_safe_float(candidate.get(k), 0.0):.4g}") for k in SCENARIO_CACHE_FEATURES]
+    payload = json.dumps(
+        [
+            SCENARIO_MODEL,
+            SCENARIO_PROMPT_VERSION,
+            language,
+            prompt_fingerprint,
+            symbol,
+            trigger_type,
+            candidate.get("theme"),
+            features,
+        ]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def default_scenario() -> Dict[str, Any]:
     return {
         "buy_score": 0,
@@ -126,6 +296,17 @@ class CryptoTrackingAgent:
     ROTATION_MIN_FINAL_SCORE = 0.50
     ROTATION_MIN_BUY_SCORE_EDGE = 1
     ROTATION_REENTRY_COOLDOWN_HOURS = 0.0
+    LLM_CONCURRENCY = 8
+    LLM_RPM = 500
+    LLM_TPM = 200000
+    LLM_MAX_TOKENS = 4000
+    LLM_RATE_LIMIT_RETRIES = 3
+    SCENARIO_CACHE_TTL_HOURS = 1.0
+    # Candidates below either Phase1 floor skip the LLM and are recorded as no_entry.
+    PREFILTER_MIN_RISK_REWARD = 1.2
+    PREFILTER_MIN_FINAL_SCORE = 0.30
+    # update_holdings and rotation checks in the same cycle reuse prices fetched this recently.
+    PRICE_CACHE_TTL_SECONDS = 5.0
 
     def __init__(
         self,
@@ -157,17 +338,45 @@ class CryptoTrackingAgent:
         self.conn: sqlite3.Connection | None = None
         self.cursor: sqlite3.Cursor | None = None
         self.trading_agent = None
+        self._prompt_fingerprint = ""
+        self._llm = None
+        self._llm_lock = asyncio.Lock()
+        # Halves on 429s and creeps back up to CRYPTO_LLM_CONCURRENCY after clean calls.
+        self._llm_sem = AdaptiveConcurrencyLimiter(
+            int(_safe_float(os.getenv("CRYPTO_LLM_CONCURRENCY"), self.LLM_CONCURRENCY))
+        )
+        self._llm_limiter = AsyncRateLimiter(
+            rpm=int(_safe_float(os.getenv("CRYPTO_LLM_RPM"), self.LLM_RPM)),
+            tpm=int(_safe_float(os.getenv("CRYPTO_LLM_TPM"), self.LLM_TPM)),
+        )
         self.paper_trader: PaperCryptoTrading | None = None
         self._cycle_exit_counts = {"stop_loss": 0, "rotation": 0, "normal": 0}
+        self._cycle_prefilter_rejects = 0
+        self._price_cache: Dict[str, Tuple[float, float]] = {}
+        # Held positions as of the last read; reset whenever crypto_holdings is written.
+        self._holdings_cache: List[Dict[str, Any]] | None = None
+        # Last sell time per symbol inside the re-entry cooldown window.
+        self._recent_sells: Dict[str, datetime] = {}
+        self._watchlist_buffer: List[Tuple[Any, ...]] = []
 
     async def initialize(self) -> bool:
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        # WAL + synchronous=NORMAL: commits skip the per-transaction fsync of the
+        # rollback journal, and dashboard readers no longer block cycle writes.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64MB
+        self.conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+        self.conn.execute("PRAGMA busy_timeout=5000")
         self.cursor = self.conn.cursor()
         create_crypto_tables(self.cursor, self.conn)
         create_crypto_indexes(self.cursor, self.conn)
-        add_theme_columns_if_missing(self.cursor, self.conn)
+        add_missing_columns(self.cursor, self.conn)
+        self._purge_scenario_cache()
         self.trading_agent = create_crypto_trading_scenario_agent(language=self.language)
+        self._prompt_fingerprint = _scenario_prompt_fingerprint(getattr(self.trading_agent, "instruction", "") or "")
         if self.execute_trades and self.trade_mode == "paper":
             self.paper_trader = PaperCryptoTrading(self.cursor, self.conn)
             logger.info("Paper trading adapter enabled (quote_amount=%.2f)", self.quote_amount)
@@ -187,40 +396,119 @@ class CryptoTrackingAgent:
             self.conn = None
             self.cursor = None
 
+    def _cached_price(self, symbol: str) -> float:
+        fetched_at, price = self._price_cache.get(symbol, (0.0, 0.0))
+        if price > 0 and (time.monotonic() - fetched_at) < self.PRICE_CACHE_TTL_SECONDS:
+            return price
+        return 0.0
+
     def _get_live_price(self, symbol: str, fallback_price: float = 0.0) -> float:
         """Get latest price using paper adapter when available."""
+        p = self._cached_price(symbol)
+        if p > 0:
+            return p
         try:
             if self.paper_trader:
                 p = _safe_float(self.paper_trader.get_current_price(symbol), 0.0)
                 if p > 0:
+                    self._price_cache[symbol] = (time.monotonic(), p)
                     return p
         except Exception:
             pass
         return fallback_price
 
-    def _build_prompt(self, symbol: str, trigger_type: str, candidate: Dict[str, Any]) -> str:
-        return f"""
-다음은 코인 후보 데이터입니다. 매매 시나리오 JSON을 생성하세요.
+    def _get_live_prices(self, holdings: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Get latest prices for all holdings in one batch, falling back to stored prices."""
+        fallbacks = {h["symbol"]: _safe_float(h.get("current_price"), 0.0) for h in holdings}
+        live = {symbol: self._cached_price(symbol) for symbol in fallbacks}
+        missing = [symbol for symbol, price in live.items() if price <= 0]
+        try:
+            if self.paper_trader and missing:
+                fetched_at = time.monotonic()
+                for symbol, price in self.paper_trader.get_current_prices(missing).items():
+                    price = _safe_float(price, 0.0)
+                    if price > 0:
+                        live[symbol] = price
+                        self._price_cache[symbol] = (fetched_at, price)
+        except Exception:
+            pass
+        return {
+            symbol: live[symbol] if live[symbol] > 0 else fallback
+            for symbol, fallback in fallbacks.items()
+        }
 
-[Candidate]
-- Symbol: {symbol}
-- Trigger: {trigger_type}
-- Current Price: {candidate.get("current_price")}
-- 1h Return (%): {candidate.get("ret_1_pct")}
-- 4h Return (%): {candidate.get("ret_4_pct")}
-- Volume Ratio(20): {candidate.get("volume_ratio_20")}
-- ATR (%): {candidate.get("atr_pct")}
-- Phase1 Risk-Reward: {candidate.get("risk_reward_ratio")}
-- Phase1 Target: {candidate.get("target_price")}
-- Phase1 Stop: {candidate.get("stop_loss_price")}
-- Phase1 Final Score: {candidate.get("final_score")}
-- Theme: {candidate.get("theme")}
+    def _purge_scenario_cache(self):
+        expired = (datetime.now() - timedelta(hours=self.SCENARIO_CACHE_TTL_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
+        self.cursor.execute(SQL_PURGE_SCENARIO_CACHE, (expired,))
+        self.conn.commit()
 
-요구사항:
-- 보수적으로 판단.
-- decision은 반드시 entry/no_entry 중 하나.
-- 숫자 필드는 숫자만.
-"""
+    def _load_cached_scenario(self, cache_key: str) -> Dict[str, Any] | None:
+        """Return a cached LLM scenario younger than SCENARIO_CACHE_TTL_HOURS."""
+        expired = (datetime.now() - timedelta(hours=self.SCENARIO_CACHE_TTL_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
+        self.cursor.execute(
+            SQL_SELECT_SCENARIO_CACHE,
+            (cache_key, expired),
+        )
+        row = self.cursor.fetchone()
+        if not row:
+            return None
+        cached = _parse_json_object(row[0])
+        return cached or None
+
+    def _store_cached_scenario(self, cache_key: str, symbol: str, scenario: Dict[str, Any]):
+        self.cursor.execute(
+            SQL_UPSERT_SCENARIO_CACHE,
+            (
+                cache_key,
+                symbol,
+                json.dumps(scenario, ensure_ascii=False),
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            ),
+        )
+        self.conn.commit()
+
+    async def _get_llm(self):
+        """Attach the scenario LLM once and reuse it (history disabled per request)."""
+        async with self._llm_lock:
+            if self._llm is None:
+                self._llm = await self.trading_agent.attach_llm(OpenAIAugmentedLLM)
+        return self._llm
+
+    async def _generate_scenario_response(self, symbol: str, trigger_type: str, candidate: Dict[str, Any]) -> str:
+        """Call the scenario LLM under the RPM/TPM limiter, backing off on 429s."""
+        llm = await self._get_llm()
+        prompt = self._build_prompt(symbol, trigger_type, candidate)
+        estimated_tokens = len(prompt) // 4 + self.LLM_MAX_TOKENS
+        for attempt in range(self.LLM_RATE_LIMIT_RETRIES + 1):
+            try:
+                async with self._llm_sem:
+                    # Take the RPM/TPM slot only once a concurrency slot is held, right before sending.
+                    await self._llm_limiter.acquire(estimated_tokens)
+                    return await llm.generate_str(
+                        message=prompt,
+                        request_params=RequestParams(
+                            model=SCENARIO_MODEL, maxTokens=self.LLM_MAX_TOKENS, use_history=False
+                        ),
+                    )
+            except Exception as e:
+                if attempt >= self.LLM_RATE_LIMIT_RETRIES or not is_rate_limit_error(e):
+                    raise
+                backoff = retry_after_seconds(e, default=2.0 ** (attempt + 1))
+                self._llm_limiter.penalize(backoff)
+                logger.warning(
+                    "Rate limited analyzing %s, retrying in %.1fs (%d/%d)",
+                    symbol,
+                    backoff,
+                    attempt + 1,
+                    self.LLM_RATE_LIMIT_RETRIES,
+                )
+
+    def _build_prompt(self, symbol: str, trigger_type: str, candidate: Dict[str, Any]) -> str:
+        return CANDIDATE_PROMPT_TEMPLATE.format(
+            symbol=symbol,
+            trigger_type=trigger_type,
+            **{key: candidate.get(key) for key in CANDIDATE_PROMPT_FIELDS},
+        )
 
     def _heuristic_scenario(self, symbol: str, candidate: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback scenario when LLM is unavailable (e.g., no API key)."""
@@ -278,19 +566,34 @@ class CryptoTrackingAgent:
                 logger.warning("OPENAI_API_KEY not found. Using heuristic scenario for %s", symbol)
                 return self._heuristic_scenario(symbol, candidate)
 
-            llm = await self.trading_agent.attach_llm(OpenAIAugmentedLLM)
-            response = await llm.generate_str(
-                message=self._build_prompt(symbol, trigger_type, candidate),
-                request_params=RequestParams(model="gpt-5-nano", maxTokens=4000),
-            )
-            parsed = _parse_json_object(response)
-            if not parsed:
-                logger.warning("Failed to parse scenario JSON for %s, fallback to default", symbol)
-                parsed = default_scenario()
+            candidate_rr = _safe_float(candidate.get("risk_reward_ratio"), 0.0)
+            candidate_final = _safe_float(candidate.get("final_score"), 0.0)
+            if candidate_rr < self.PREFILTER_MIN_RISK_REWARD or candidate_final < self.PREFILTER_MIN_FINAL_SCORE:
+                self._cycle_prefilter_rejects += 1
+                scenario = self._heuristic_scenario(symbol, candidate)
+                scenario["decision"] = "no_entry"
+                scenario["rationale"] = (
+                    f"Pre-filter: weak phase1 metrics (rr={candidate_rr:.2f}, final_score={candidate_final:.3f})"
+                )
+                return scenario
+
+            cache_key = _scenario_cache_key(symbol, trigger_type, candidate, self.language, self._prompt_fingerprint)
+            parsed = self._load_cached_scenario(cache_key)
+            if parsed:
+                logger.info("Scenario cache hit for %s (%s)", symbol, trigger_type)
+            else:
+                response = await self._generate_scenario_response(symbol, trigger_type, candidate)
+                parsed = _parse_json_object(response)
+                if parsed:
+                    self._store_cached_scenario(cache_key, symbol, parsed)
+                else:
+                    logger.warning("Failed to parse scenario JSON for %s, fallback to default", symbol)
+                    parsed = default_scenario()
 
             # Normalize/fill using phase1 metrics when missing.
-            parsed.setdefault("buy_score", 0)
-            parsed.setdefault("min_score", 6)
+            # decision/buy_score/min_score leave here canonical (lowercase str, int, int).
+            parsed["buy_score"] = int(_safe_float(parsed.get("buy_score"), 0))
+            parsed["min_score"] = int(_safe_float(parsed.get("min_score"), 6))
             parsed.setdefault("decision", "no_entry")
             parsed["decision"] = str(parsed["decision"]).strip().lower()
             if parsed["decision"] not in ("entry", "no_entry"):
@@ -313,10 +616,29 @@ class CryptoTrackingAgent:
             parsed.setdefault("trading_scenarios", {})
             return parsed
         except Exception as e:
-            logger.error("Error analyzing candidate %s: %s", symbol, e)
-            logger.error(traceback.format_exc())
+            logger.exception("Error analyzing candidate %s: %s", symbol, e)
             return self._heuristic_scenario(symbol, candidate)
 
+    async def analyze_candidates_bulk(
+        self, items: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Analyze (symbol, trigger_type, candidate) tuples concurrently.
+
+        LLM calls are bounded by CRYPTO_LLM_CONCURRENCY; results keep input order.
+        """
+        results = await asyncio.gather(
+            *[self.analyze_candidate(symbol, trigger_type, candidate) for symbol, trigger_type, candidate in items],
+            return_exceptions=True,
+        )
+        # Cancellation/shutdown must not turn into heuristic (possibly "entry") scenarios.
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return [
+            self._heuristic_scenario(symbol, candidate) if isinstance(result, Exception) else result
+            for (symbol, _, candidate), result in zip(items, results)
+        ]
+
     async def _save_watchlist(
         self,
         symbol: str,
@@ -324,15 +646,11 @@ class CryptoTrackingAgent:
         candidate: Dict[str, Any],
         scenario: Dict[str, Any],
         reason: str,
+        now_dt: datetime | None = None,
     ):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.cursor.execute(
-            """
-            INSERT INTO crypto_watchlist_history
-            (symbol, analyzed_date, current_price, buy_score, min_score, decision, skip_reason,
-             target_price, stop_loss, risk_reward_ratio, trigger_type, timeframe, theme, scenario)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        """Queue a watchlist row; _flush_watchlist() writes the cycle's rows in one batch."""
+        now = (now_dt or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+        self._watchlist_buffer.append(
             (
                 symbol,
                 now,
@@ -348,8 +666,13 @@ class CryptoTrackingAgent:
                 self.timeframe,
                 scenario.get("theme", classify_symbol_theme(symbol)),
                 json.dumps(scenario, ensure_ascii=False),
-            ),
+            )
         )
+
+    def _flush_watchlist(self):
+        if self._watchlist_buffer:
+            self.cursor.executemany(SQL_INSERT_WATCHLIST, self._watchlist_buffer)
+            self._watchlist_buffer = []
         self.conn.commit()
 
     async def _save_holding(
@@ -359,8 +682,10 @@ class CryptoTrackingAgent:
         candidate: Dict[str, Any],
         scenario: Dict[str, Any],
         execution: Dict[str, Any] | None = None,
+        now_dt: datetime | None = None,
     ):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now_dt = now_dt or datetime.now()
+        now = now_dt.strftime("%Y-%m-%d %H:%M:%S")
         fallback_price = _safe_float(candidate.get("current_price"), 0.0)
         exec_price = _safe_float((execution or {}).get("executed_price"), fallback_price)
         exec_qty = _safe_float((execution or {}).get("quantity"), 0.0)
@@ -374,17 +699,13 @@ class CryptoTrackingAgent:
 
         asset_name = symbol.split("-")[0].upper()
         self.cursor.execute(
-            """
-            INSERT INTO crypto_holdings
-            (symbol, asset_name, buy_price, buy_date, quantity, notional_usd, current_price,
-             last_updated, scenario, target_price, stop_loss, trigger_type, timeframe, theme)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            SQL_INSERT_HOLDING,
             (
                 symbol,
                 asset_name,
                 exec_price,
                 now,
+                now_dt.timestamp(),
                 exec_qty if exec_qty > 0 else None,
                 exec_notional if exec_notional > 0 else None,
                 exec_price if exec_price > 0 else fallback_price,
@@ -398,15 +719,29 @@ class CryptoTrackingAgent:
             ),
         )
         self.conn.commit()
+        self._holdings_cache = None
+
+    @staticmethod
+    def _holding_hours(holding: Dict[str, Any], now_dt: datetime) -> float:
+        """Hours since entry from buy_ts (epoch), parsing buy_date only for legacy rows."""
+        buy_ts = holding.get("buy_ts")
+        if buy_ts is None:
+            try:
+                buy_ts = datetime.fromisoformat(str(holding.get("buy_date") or "")).timestamp()
+            except Exception:
+                buy_ts = now_dt.timestamp()
+            holding["buy_ts"] = buy_ts
+        return max((now_dt.timestamp() - buy_ts) / 3600.0, 0.0)
 
-    async def _analyze_sell_decision(self, holding: Dict[str, Any]) -> Tuple[bool, str]:
+    async def _analyze_sell_decision(
+        self, holding: Dict[str, Any], now_dt: datetime | None = None
+    ) -> Tuple[bool, str]:
         """Rule-based sell decision for current holdings."""
         try:
             buy_price = _safe_float(holding.get("buy_price"), 0.0)
             current_price = _safe_float(holding.get("current_price"), 0.0)
             target_price = _safe_float(holding.get("target_price"), 0.0)
             stop_loss = _safe_float(holding.get("stop_loss"), 0.0)
-            buy_date = str(holding.get("buy_date") or "")
             scenario = _parse_scenario_field(holding.get("scenario"))
             trailing_active = bool(scenario.get("trailing_active", False))
             dynamic_stop = _safe_float(scenario.get("dynamic_stop_loss"), 0.0)
@@ -414,12 +749,7 @@ class CryptoTrackingAgent:
             if buy_price <= 0 or current_price <= 0:
                 return False, "invalid price context"
 
-            now_dt = datetime.now()
-            try:
-                buy_dt = datetime.strptime(buy_date, "%Y-%m-%d %H:%M:%S")
-            except Exception:
-                buy_dt = now_dt
-            holding_hours = max((now_dt - buy_dt).total_seconds() / 3600.0, 0.0)
+            holding_hours = self._holding_hours(holding, now_dt or datetime.now())
             profit_rate = ((current_price - buy_price) / buy_price) * 100.0
 
             # Priority 1: hard stop/target
@@ -484,42 +814,54 @@ class CryptoTrackingAgent:
 
     @staticmethod
     def _classify_exit_reason(sell_reason: str) -> str:
-        reason = (sell_reason or "").strip().lower()
-        if "rotation replace:" in reason:
+        reason = sell_reason or ""
+        if _ROTATION_EXIT_RE.search(reason):
             return "rotation"
-        if "stop loss" in reason or "trailing stop" in reason or "loss guard" in reason:
+        if _STOP_EXIT_RE.search(reason):
             return "stop_loss"
         return "normal"
 
     def _reset_cycle_exit_counts(self):
         self._cycle_exit_counts = {"stop_loss": 0, "rotation": 0, "normal": 0}
+        self._cycle_prefilter_rejects = 0
+
+    def _reset_cycle_caches(self):
+        """Drop per-cycle read caches (live prices, holdings, recent sells) before a new cycle."""
+        self._price_cache.clear()
+        self._holdings_cache = None
+        self._recent_sells = {}
+
+    def _get_holdings_cached(self) -> List[Dict[str, Any]]:
+        if self._holdings_cache is None:
+            self.cursor.execute(SQL_SELECT_HOLDINGS)
+            self._holdings_cache = [dict(r) for r in self.cursor.fetchall()]
+        return self._holdings_cache
 
     def _count_exit(self, exit_category: str):
         if exit_category not in self._cycle_exit_counts:
             exit_category = "normal"
         self._cycle_exit_counts[exit_category] = self._cycle_exit_counts.get(exit_category, 0) + 1
 
+    def _load_recent_sells(self, now_dt: datetime):
+        """Load last sell times within the re-entry cooldown window in one query."""
+        self._recent_sells = {}
+        if self.rotation_reentry_cooldown_hours <= 0:
+            return
+        cutoff = now_dt - timedelta(hours=self.rotation_reentry_cooldown_hours)
+        self.cursor.execute(SQL_SELECT_RECENT_SELLS, (cutoff.strftime("%Y-%m-%d %H:%M:%S"),))
+        for symbol, sell_date in self.cursor.fetchall():
+            try:
+                self._recent_sells[symbol] = datetime.fromisoformat(str(sell_date))
+            except Exception:
+                continue
+
     def _is_reentry_cooldown_active(self, symbol: str) -> Tuple[bool, str]:
         if self.rotation_reentry_cooldown_hours <= 0:
             return False, ""
-        self.cursor.execute(
-            """
-            SELECT sell_date
-            FROM crypto_trading_history
-            WHERE symbol = ?
-            ORDER BY sell_date DESC, id DESC
-            LIMIT 1
-            """,
-            (symbol,),
-        )
-        row = self.cursor.fetchone()
-        if not row or not row[0]:
+        last_sell_dt = self._recent_sells.get(symbol)
+        if last_sell_dt is None:
             return False, ""
 
-        try:
-            last_sell_dt = datetime.strptime(str(row[0]), "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            return False, ""
         cooldown_until = last_sell_dt + timedelta(hours=self.rotation_reentry_cooldown_hours)
         now_dt = datetime.now()
         if now_dt < cooldown_until:
@@ -530,7 +872,9 @@ class CryptoTrackingAgent:
             )
         return False, ""
 
-    async def _sell_holding(self, holding: Dict[str, Any], sell_reason: str) -> bool:
+    async def _sell_holding(
+        self, holding: Dict[str, Any], sell_reason: str, now_dt: datetime | None = None
+    ) -> bool:
         """Execute sell (paper if enabled), then archive to history and remove holding."""
         symbol = str(holding.get("symbol") or "")
         if not symbol:
@@ -561,22 +905,13 @@ class CryptoTrackingAgent:
             execution_price = _safe_float(sell_res.get("executed_price"), current_price)
 
         buy_date = str(holding.get("buy_date") or "")
-        now_dt = datetime.now()
-        try:
-            buy_dt = datetime.strptime(buy_date, "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            buy_dt = now_dt
-        holding_hours = max((now_dt - buy_dt).total_seconds() / 3600.0, 0.0)
+        now_dt = now_dt or datetime.now()
+        holding_hours = self._holding_hours(holding, now_dt)
         profit_rate = ((execution_price - buy_price) / buy_price) * 100.0 if buy_price > 0 else 0.0
         now = now_dt.strftime("%Y-%m-%d %H:%M:%S")
 
         self.cursor.execute(
-            """
-            INSERT INTO crypto_trading_history
-            (symbol, asset_name, buy_price, buy_date, quantity, notional_usd, sell_price, sell_date,
-             profit_rate, holding_hours, scenario, trigger_type, timeframe, theme)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            SQL_INSERT_HISTORY,
             (
                 symbol,
                 holding.get("asset_name", symbol.split("-")[0].upper()),
@@ -595,8 +930,11 @@ class CryptoTrackingAgent:
             ),
         )
 
-        self.cursor.execute("DELETE FROM crypto_holdings WHERE symbol = ?", (symbol,))
+        self.cursor.execute(SQL_DELETE_HOLDING, (symbol,))
         self.conn.commit()
+        self._holdings_cache = None
+        if self.rotation_reentry_cooldown_hours > 0:
+            self._recent_sells[symbol] = now_dt
         self._count_exit(exit_category)
         logger.info(
             "SELL %s @ %.6f (buy %.6f, pnl %.2f%%, %.1fh) reason=%s exit_category=%s",
@@ -612,48 +950,54 @@ class CryptoTrackingAgent:
 
     async def update_holdings(self) -> int:
         """Refresh holdings and execute sell loop. Returns sold count."""
-        self.cursor.execute(
-            """
-            SELECT symbol, asset_name, buy_price, buy_date, quantity, notional_usd, current_price,
-                   scenario, target_price, stop_loss, trigger_type, timeframe, theme
-            FROM crypto_holdings
-            """
-        )
-        holdings = [dict(r) for r in self.cursor.fetchall()]
+        holdings = list(self._get_holdings_cached())
         if not holdings:
             return 0
 
         sold_count = 0
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now_dt = datetime.now()
+        now = now_dt.strftime("%Y-%m-%d %H:%M:%S")
+        updates = []
+        kept = []
+        sell_failed = False
+        live_prices = self._get_live_prices(holdings)
         for holding in holdings:
             symbol = holding["symbol"]
-            current_price = self._get_live_price(symbol, _safe_float(holding.get("current_price"), 0.0))
+            current_price = live_prices[symbol]
             holding["current_price"] = current_price
             updated_scenario, effective_stop = self._refresh_trailing_state(holding)
             holding["scenario"] = updated_scenario
             holding["stop_loss"] = effective_stop
 
-            should_sell, reason = await self._analyze_sell_decision(holding)
+            should_sell, reason = await self._analyze_sell_decision(holding, now_dt)
             if should_sell:
-                sold = await self._sell_holding(holding, reason)
+                sold = await self._sell_holding(holding, reason, now_dt)
                 if sold:
                     sold_count += 1
-            else:
-                self.cursor.execute(
-                    """
-                    UPDATE crypto_holdings
-                    SET current_price = ?, stop_loss = ?, scenario = ?, last_updated = ?
-                    WHERE symbol = ?
-                    """,
-                    (
-                        current_price,
-                        _safe_float(effective_stop, 0.0) if effective_stop > 0 else None,
-                        json.dumps(updated_scenario, ensure_ascii=False),
-                        now,
-                        symbol,
-                    ),
+                else:
+                    # Unsold row keeps its stored state; re-read it rather than cache the refresh.
+                    sell_failed = True
+                continue
+            kept.append(holding)
+            updates.append(
+                (
+                    current_price,
+                    _safe_float(effective_stop, 0.0) if effective_stop > 0 else None,
+                    json.dumps(updated_scenario, ensure_ascii=False),
+                    now,
+                    symbol,
                 )
-                self.conn.commit()
+            )
+
+        # Persist all held-position refreshes in a single transaction.
+        if updates:
+            self.cursor.executemany(
+                SQL_UPDATE_HOLDING,
+                updates,
+            )
+            self.conn.commit()
+        # Refreshed rows (live price, trailing stop) serve rotation checks for the rest of the cycle.
+        self._holdings_cache = None if sell_failed else kept
         return sold_count
 
     def _holding_final_score(self, holding: Dict[str, Any]) -> float:
@@ -693,29 +1037,19 @@ class CryptoTrackingAgent:
                 f"< min_score+edge ({min_score}+{self.ROTATION_MIN_BUY_SCORE_EDGE})"
             ), 0
 
-        self.cursor.execute(
-            """
-            SELECT symbol, asset_name, buy_price, buy_date, quantity, notional_usd, current_price,
-                   scenario, target_price, stop_loss, trigger_type, timeframe, theme
-            FROM crypto_holdings
-            """
-        )
-        holdings = [dict(r) for r in self.cursor.fetchall()]
+        holdings = self._get_holdings_cached()
         if not holdings:
             return False, "no holdings for rotation", 0
 
+        now_dt = datetime.now()
+        live_prices = self._get_live_prices(holdings)
         ranked = []
         for h in holdings:
             h_score = self._holding_final_score(h)
-            live_price = self._get_live_price(h["symbol"], _safe_float(h.get("current_price"), 0.0))
+            live_price = live_prices[h["symbol"]]
             buy_price = _safe_float(h.get("buy_price"), 0.0)
             profit_rate = ((live_price - buy_price) / buy_price * 100.0) if buy_price > 0 else 0.0
-            buy_date = str(h.get("buy_date") or "")
-            try:
-                buy_dt = datetime.strptime(buy_date, "%Y-%m-%d %H:%M:%S")
-            except Exception:
-                buy_dt = datetime.now()
-            holding_hours = max((datetime.now() - buy_dt).total_seconds() / 3600.0, 0.0)
+            holding_hours = self._holding_hours(h, now_dt)
             is_loss_priority = profit_rate <= self.ROTATION_LOSS_PRIORITY_PCT
             ranked.append((h, h_score, profit_rate, is_loss_priority, holding_hours))
 
@@ -748,7 +1082,7 @@ class CryptoTrackingAgent:
             f"-> {symbol} (score={new_final_score:.3f})"
         )
 
-        sold = await self._sell_holding(target_holding, sell_reason)
+        sold = await self._sell_holding(target_holding, sell_reason, now_dt)
         if not sold:
             return False, f"rotation sell failed: {target_holding['symbol']}", 0
 
@@ -767,7 +1101,7 @@ class CryptoTrackingAgent:
             if not execution.get("success"):
                 return False, f"paper buy failed after rotation: {execution.get('message', 'unknown')}", 1
 
-        await self._save_holding(symbol, trigger_type, candidate, scenario, execution=execution)
+        await self._save_holding(symbol, trigger_type, candidate, scenario, execution=execution, now_dt=now_dt)
         if execution and execution.get("success"):
             logger.info(
                 "ROTATION_ENTRY+TRADE %s (%s) score=%s/%s qty=%.8f @ %.6f",
@@ -789,135 +1123,205 @@ class CryptoTrackingAgent:
             (entry_count, no_entry_count, sold_count)
         """
         self._reset_cycle_exit_counts()
+        self._reset_cycle_caches()
         sold_count = await self.update_holdings()
+        self._load_recent_sells(datetime.now())
         with open(candidates_json_path, "r", encoding="utf-8") as f:
             data = json.load(f)
 
         entry_count = 0
         no_entry_count = 0
         rotations_done = 0
-
+        # Held symbols for the cycle; kept in step with entries and re-read after rotations.
+        held = {h["symbol"] for h in self._get_holdings_cached()}
+
+        # LLM analysis runs lazily in concurrent waves of the upcoming candidates, each as
+        # wide as the LLM concurrency limit (never narrower than the entries still possible).
+        # Once slots are full and the rotation budget is spent, the rest of the list is
+        # recorded without an LLM call.
+        # One candidate per symbol: when a symbol shows up under several triggers,
+        # only its first occurrence is analyzed and decided (file order sets slot priority).
+        first_by_symbol: Dict[str, Tuple[str, str, Dict[str, Any]]] = {}
         for trigger_type, items in data.items():
-            if trigger_type == "metadata":
-                continue
-            if not isinstance(items, list):
+            if trigger_type == "metadata" or not isinstance(items, list):
                 continue
-
-            trigger_holdings_skipped = 0
             for item in items:
                 symbol = item.get("symbol")
                 if not symbol:
                     continue
                 if not item.get("theme"):
                     item["theme"] = classify_symbol_theme(symbol)
-
-                if is_crypto_symbol_in_holdings(self.cursor, symbol):
-                    logger.info("Skip already-held symbol: %s", symbol)
-                    trigger_holdings_skipped += 1
+                if symbol in held:
                     continue
-
-                cooldown_active, cooldown_reason = self._is_reentry_cooldown_active(symbol)
-                if cooldown_active:
-                    await self._save_watchlist(symbol, trigger_type, item, default_scenario(), cooldown_reason)
-                    no_entry_count += 1
-                    logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, cooldown_reason)
+                if self._is_reentry_cooldown_active(symbol)[0]:
+                    continue
+                first_by_symbol.setdefault(symbol, (symbol, trigger_type, item))
+        pending = list(first_by_symbol.values())
+        chosen = {symbol: id(item) for symbol, _, item in pending}
+        pending_index = {id(item): i for i, (_, _, item) in enumerate(pending)}
+        scenarios: Dict[int, Dict[str, Any]] = {}
+        entry_prices: Dict[str, float] = {}
+
+        # Watchlist rows are buffered and written together at the end of the cycle.
+        try:
+            for trigger_type, items in data.items():
+                if trigger_type == "metadata":
+                    continue
+                if not isinstance(items, list):
+                    continue
+                n_items = len(items)
+                if n_items and all(it.get("symbol") in held for it in items):
+                    logger.info(
+                        "All candidates skipped for %s: already in holdings (%d/%d)",
+                        trigger_type,
+                        n_items,
+                        n_items,
+                    )
                     continue
 
-                scenario = await self.analyze_candidate(symbol, trigger_type, item)
-                buy_score = int(_safe_float(scenario.get("buy_score"), 0))
-                min_score = int(_safe_float(scenario.get("min_score"), 6))
-                decision = str(scenario.get("decision", "no_entry")).lower()
+                for item in items:
+                    symbol = item.get("symbol")
+                    if not symbol:
+                        continue
+                    if not item.get("theme"):
+                        item["theme"] = classify_symbol_theme(symbol)
 
-                if decision == "entry" and buy_score >= min_score:
-                    if get_crypto_holdings_count(self.cursor) >= self.max_slots:
-                        if rotations_done < self.ROTATION_MAX_PER_CYCLE:
-                            rotated, reason, rotated_sold_count = await self._try_rotation_entry(
-                                symbol=symbol,
-                                trigger_type=trigger_type,
-                                candidate=item,
-                                scenario=scenario,
-                                buy_score=buy_score,
-                                min_score=min_score,
-                            )
-                            sold_count += rotated_sold_count
-                            if rotated:
-                                entry_count += 1
-                                rotations_done += 1
-                                continue
-                            await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
-                            no_entry_count += 1
-                            logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
-                            continue
+                    if symbol in held:
+                        logger.info("Skip already-held symbol: %s", symbol)
+                        continue
 
-                        reason = (
-                            f"max slots reached ({self.max_slots}), "
-                            f"rotation limit reached ({self.ROTATION_MAX_PER_CYCLE}/cycle)"
-                        )
-                        await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
+                    cooldown_active, cooldown_reason = self._is_reentry_cooldown_active(symbol)
+                    if cooldown_active:
+                        await self._save_watchlist(symbol, trigger_type, item, default_scenario(), cooldown_reason)
                         no_entry_count += 1
-                        logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
+                        logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, cooldown_reason)
                         continue
 
-                    execution = None
-                    if self.execute_trades:
-                        if self.trade_mode != "paper":
-                            reason = f"unsupported trade_mode={self.trade_mode}"
-                            await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
-                            no_entry_count += 1
-                            logger.warning("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
-                            continue
+                    if chosen.get(symbol, id(item)) != id(item):
+                        logger.info("Skip duplicate candidate %s (%s): decided under another trigger", symbol, trigger_type)
+                        continue
 
-                        if not self.paper_trader:
-                            reason = "paper trader not initialized"
-                            await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
+                    scenario = scenarios.get(id(item))
+                    if scenario is None:
+                        if len(held) >= self.max_slots and rotations_done >= self.ROTATION_MAX_PER_CYCLE:
+                            reason = (
+                                f"analysis skipped: max slots reached ({self.max_slots}), "
+                                f"rotation limit reached ({self.ROTATION_MAX_PER_CYCLE}/cycle)"
+                            )
+                            await self._save_watchlist(symbol, trigger_type, item, default_scenario(), reason)
                             no_entry_count += 1
-                            logger.warning("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
+                            logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
                             continue
+                        start = pending_index.get(id(item))
+                        if start is None:
+                            scenario = await self.analyze_candidate(symbol, trigger_type, item)
+                        else:
+                            capacity = max(0, self.max_slots - len(held)) + (
+                                self.ROTATION_MAX_PER_CYCLE - rotations_done
+                            )
+                            wave = pending[start:start + max(self._llm_sem.limit, capacity)]
+                            analyzed = await self.analyze_candidates_bulk(wave)
+                            scenarios.update((id(it), sc) for (_, _, it), sc in zip(wave, analyzed))
+                            # Batch-quote only the entry-eligible symbols that fit the free slots; rotation
+                            # buys and any later entries fall back to a per-symbol quote in buy().
+                            free_slots = self.max_slots - len(held)
+                            if self.execute_trades and self.paper_trader and free_slots > 0:
+                                eligible = [
+                                    {"symbol": sym}
+                                    for (sym, _, _), sc in zip(wave, analyzed)
+                                    if sc["decision"] == "entry" and sc["buy_score"] >= sc["min_score"]
+                                ]
+                                if eligible:
+                                    entry_prices.update(self._get_live_prices(eligible[:free_slots]))
+                            scenario = scenarios[id(item)]
+                    buy_score = scenario["buy_score"]
+                    min_score = scenario["min_score"]
+                    decision = scenario["decision"]
+
+                    if decision == "entry" and buy_score >= min_score:
+                        if len(held) >= self.max_slots:
+                            if rotations_done < self.ROTATION_MAX_PER_CYCLE:
+                                rotated, reason, rotated_sold_count = await self._try_rotation_entry(
+                                    symbol=symbol,
+                                    trigger_type=trigger_type,
+                                    candidate=item,
+                                    scenario=scenario,
+                                    buy_score=buy_score,
+                                    min_score=min_score,
+                                )
+                                sold_count += rotated_sold_count
+                                if rotated_sold_count:
+                                    held = {h["symbol"] for h in self._get_holdings_cached()}
+                                if rotated:
+                                    entry_count += 1
+                                    rotations_done += 1
+                                    continue
+                                await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
+                                no_entry_count += 1
+                                logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
+                                continue
 
-                        execution = self.paper_trader.buy(
-                            symbol=symbol,
-                            quote_amount=self.quote_amount,
-                            limit_price=None,
-                            metadata={"trigger_type": trigger_type},
-                        )
-                        if not execution.get("success"):
-                            reason = f"paper buy failed: {execution.get('message', 'unknown')}"
+                            reason = (
+                                f"max slots reached ({self.max_slots}), "
+                                f"rotation limit reached ({self.ROTATION_MAX_PER_CYCLE}/cycle)"
+                            )
                             await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
                             no_entry_count += 1
-                            logger.warning("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
+                            logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
                             continue
 
-                    await self._save_holding(symbol, trigger_type, item, scenario, execution=execution)
-                    entry_count += 1
-                    if execution and execution.get("success"):
-                        logger.info(
-                            "ENTRY+TRADE %s (%s) score=%s/%s qty=%.8f @ %.6f",
-                            symbol,
-                            trigger_type,
-                            buy_score,
-                            min_score,
-                            _safe_float(execution.get("quantity"), 0.0),
-                            _safe_float(execution.get("executed_price"), 0.0),
-                        )
+                        execution = None
+                        if self.execute_trades:
+                            if self.trade_mode != "paper":
+                                reason = f"unsupported trade_mode={self.trade_mode}"
+                                await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
+                                no_entry_count += 1
+                                logger.warning("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
+                                continue
+
+                            if not self.paper_trader:
+                                reason = "paper trader not initialized"
+                                await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
+                                no_entry_count += 1
+                                logger.warning("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
+                                continue
+
+                            execution = self.paper_trader.buy(
+                                symbol=symbol,
+                                quote_amount=self.quote_amount,
+                                limit_price=None,
+                                metadata={"trigger_type": trigger_type},
+                                market_price=entry_prices.get(symbol),
+                            )
+                            if not execution.get("success"):
+                                reason = f"paper buy failed: {execution.get('message', 'unknown')}"
+                                await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
+                                no_entry_count += 1
+                                logger.warning("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
+                                continue
+
+                        await self._save_holding(symbol, trigger_type, item, scenario, execution=execution)
+                        held.add(symbol)
+                        entry_count += 1
+                        if execution and execution.get("success"):
+                            logger.info(
+                                "ENTRY+TRADE %s (%s) score=%s/%s qty=%.8f @ %.6f",
+                                symbol,
+                                trigger_type,
+                                buy_score,
+                                min_score,
+                                _safe_float(execution.get("quantity"), 0.0),
+                                _safe_float(execution.get("executed_price"), 0.0),
+                            )
+                        else:
+                            logger.info("ENTRY %s (%s) score=%s/%s", symbol, trigger_type, buy_score, min_score)
                     else:
-                        logger.info("ENTRY %s (%s) score=%s/%s", symbol, trigger_type, buy_score, min_score)
-                else:
-                    reason = (
-                        f"decision={decision}, score={buy_score}/{min_score}"
-                        if decision != "entry" or buy_score < min_score
-                        else "no entry"
-                    )
-                    await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
-                    no_entry_count += 1
-                    logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
-
-            if trigger_holdings_skipped and trigger_holdings_skipped == len(items):
-                logger.info(
-                    "All candidates skipped for %s: already in holdings (%d/%d)",
-                    trigger_type,
-                    trigger_holdings_skipped,
-                    len(items),
-                )
+                        reason = f"decision={decision}, score={buy_score}/{min_score}"
+                        await self._save_watchlist(symbol, trigger_type, item, scenario, reason)
+                        no_entry_count += 1
+                        logger.info("NO_ENTRY %s (%s): %s", symbol, trigger_type, reason)
+        finally:
+            self._flush_watchlist()
 
         logger.info(
             "Cycle exit summary - stop_loss=%d, rotation=%d, normal=%d, total=%d",
@@ -926,24 +1330,34 @@ class CryptoTrackingAgent:
             self._cycle_exit_counts.get("normal", 0),
             sold_count,
         )
+        logger.info("Cycle LLM pre-filter rejects: %d", self._cycle_prefilter_rejects)
 
         return entry_count, no_entry_count, sold_count
 
 
-async def _amain(candidates_json_path: str, db_path: str, language: str, rotation_reentry_cooldown_hours: float = 0.0):
+async def _amain(
+    candidates_json_path: str,
+    db_path: str,
+    language: str,
+    rotation_reentry_cooldown_hours: float = 0.0,
+    **agent_kwargs: Any,
+):
+    """Run one candidate cycle; shared by the CLI and programmatic callers."""
     agent = CryptoTrackingAgent(
         db_path=db_path,
         language=language,
         rotation_reentry_cooldown_hours=rotation_reentry_cooldown_hours,
+        **agent_kwargs,
     )
     await agent.initialize()
     try:
         entry_count, no_entry_count, sold_count = await agent.process_candidates_file(candidates_json_path)
         logger.info(
-            "Crypto process complete - entry=%d, no_entry=%d, sold=%d",
+            "Crypto phase3 process complete - entry=%d, no_entry=%d, sold=%d, execute_trades=%s",
             entry_count,
             no_entry_count,
             sold_count,
+            agent.execute_trades,
         )
     finally:
         await agent.close()
@@ -972,31 +1386,19 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    async def _run():
-        agent = CryptoTrackingAgent(
+    asyncio.run(
+        _amain(
+            args.candidates_json,
             db_path=args.db_path,
             language=args.language,
+            rotation_reentry_cooldown_hours=args.rotation_reentry_cooldown_hours,
             timeframe=args.timeframe,
             execute_trades=args.execute_trades,
             trade_mode=args.trade_mode,
             quote_amount=args.quote_amount,
-            rotation_min_score_delta=max(args.rotation_min_score_delta, 0.0),
-            rotation_min_holding_hours=max(args.rotation_min_holding_hours, 0.0),
-            rotation_min_candidate_rr=max(args.rotation_min_candidate_rr, 0.0),
-            rotation_min_final_score=max(args.rotation_min_final_score, 0.0),
-            rotation_reentry_cooldown_hours=max(args.rotation_reentry_cooldown_hours, 0.0),
+            rotation_min_score_delta=args.rotation_min_score_delta,
+            rotation_min_holding_hours=args.rotation_min_holding_hours,
+            rotation_min_candidate_rr=args.rotation_min_candidate_rr,
+            rotation_min_final_score=args.rotation_min_final_score,
         )
-        await agent.initialize()
-        try:
-            entry_count, no_entry_count, sold_count = await agent.process_candidates_file(args.candidates_json)
-            logger.info(
-                "Crypto phase3 process complete - entry=%d, no_entry=%d, sold=%d, execute_trades=%s",
-                entry_count,
-                no_entry_count,
-                sold_count,
-                args.execute_trades,
-            )
-        finally:
-            await agent.close()
-
-    asyncio.run(_run())
+    )
@@ -20,7 +20,8 @@ import datetime as dt
 import json
 import logging
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 from typing import Dict, List, Tuple
 
 import numpy as np
@@ -56,6 +57,20 @@ DEFAULT_SYMBOLS = [
 ]
 
 DEFAULT_FALLBACK_MAX_ENTRIES = 1
+# Per-symbol fallback fetches are network-bound; overlap them up to this many at once.
+FETCH_MAX_WORKERS = 8
+SNAPSHOT_NUMERIC_COLUMNS = (
+    "close",
+    "volume",
+    "amount",
+    "ret_1_pct",
+    "ret_4_pct",
+    "volume_ratio_20",
+    "atr_pct",
+    "atr_expansion",
+    "trend_gap_pct",
+    "breakout_pct",
+)
 SUPPORTED_YFINANCE_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "4h", "1d", "5d", "1wk", "1mo", "3mo"}
 
 
@@ -78,28 +93,28 @@ class TriggerThresholds:
     target_min_pct: float = 0.055
 
 
+def _atr_expansion_median(snapshot: pd.DataFrame) -> float:
+    """Median ATR expansion, as cached by build_snapshot() when available."""
+    cached = snapshot.attrs.get("atr_expansion_median")
+    if cached is not None:
+        return float(cached)
+    return float(snapshot["atr_expansion"].median()) if "atr_expansion" in snapshot.columns else 1.0
+
+
 def _effective_thresholds(snapshot: pd.DataFrame, base: TriggerThresholds) -> TriggerThresholds:
     if snapshot.empty:
         return base
 
-    atr_expansion_median = float(snapshot["atr_expansion"].median()) if "atr_expansion" in snapshot.columns else 1.0
-    volatility_overheat = max(0.0, atr_expansion_median - 1.0)
+    volatility_overheat = max(0.0, _atr_expansion_median(snapshot) - 1.0)
     tighten = min(volatility_overheat * max(base.volatility_tightening_factor, 0.0), 0.25)
-
-    return TriggerThresholds(
-        volume_momentum_volume_ratio_min=base.volume_momentum_volume_ratio_min * (1.0 + tighten),
-        volume_momentum_ret_1_min_pct=base.volume_momentum_ret_1_min_pct * (1.0 + tighten),
-        volatility_trend_ret_4_min_pct=base.volatility_trend_ret_4_min_pct * (1.0 + tighten),
-        range_breakout_volume_ratio_min=base.range_breakout_volume_ratio_min * (1.0 + tighten),
-        volatility_tightening_factor=base.volatility_tightening_factor,
-        entry_min_trend_gap_pct=base.entry_min_trend_gap_pct,
-        entry_min_volume_ratio_20=base.entry_min_volume_ratio_20,
-        entry_max_atr_pct=base.entry_max_atr_pct,
-        stop_loss_atr_multiplier=base.stop_loss_atr_multiplier,
-        stop_loss_min_pct=base.stop_loss_min_pct,
-        stop_loss_max_pct=base.stop_loss_max_pct,
-        target_to_stop_ratio=base.target_to_stop_ratio,
-        target_min_pct=base.target_min_pct,
+    scale = 1.0 + tighten
+
+    return replace(
+        base,
+        volume_momentum_volume_ratio_min=base.volume_momentum_volume_ratio_min * scale,
+        volume_momentum_ret_1_min_pct=base.volume_momentum_ret_1_min_pct * scale,
+        volatility_trend_ret_4_min_pct=base.volatility_trend_ret_4_min_pct * scale,
+        range_breakout_volume_ratio_min=base.range_breakout_volume_ratio_min * scale,
     )
 
 
@@ -108,20 +123,14 @@ def _ema(series: pd.Series, window: int) -> pd.Series:
 
 
 def _atr_percent(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    high = df["High"]
-    low = df["Low"]
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
     close = df["Close"]
-    prev_close = close.shift(1)
+    prev_close = close.shift(1).to_numpy(dtype=float)
 
-    tr = pd.concat(
-        [
-            high - low,
-            (high - prev_close).abs(),
-            (low - prev_close).abs(),
-        ],
-        axis=1,
-    ).max(axis=1)
-    atr = tr.rolling(period).mean()
+    # True range on raw arrays; fmax skips the NaN prev_close on the first bar.
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    atr = pd.Series(tr, index=df.index).rolling(period).mean()
     return (atr / close).replace([np.inf, -np.inf], np.nan)
 
 
@@ -129,18 +138,16 @@ def _normalize_score(df: pd.DataFrame, cols: List[Tuple[str, float]]) -> pd.Seri
     if df.empty:
         return pd.Series(dtype=float)
 
-    score = pd.Series(0.0, index=df.index)
-    weight_sum = sum(weight for _, weight in cols) or 1.0
+    weights = np.array([weight for _, weight in cols], dtype=float)
+    weight_sum = weights.sum() or 1.0
 
-    for col, weight in cols:
-        col_data = df[col].astype(float)
-        col_min = col_data.min()
-        col_max = col_data.max()
-        col_range = col_max - col_min if col_max > col_min else 1.0
-        normalized = (col_data - col_min) / col_range
-        score += normalized * weight
-
-    return score / weight_sum
+    # Min-max normalize all score columns at once, then take the weighted sum per row.
+    values = df[[col for col, _ in cols]].to_numpy(dtype=float)
+    col_min = np.nanmin(values, axis=0)
+    col_max = np.nanmax(values, axis=0)
+    col_range = np.where(col_max > col_min, col_max - col_min, 1.0)
+    score = ((values - col_min) / col_range) @ weights
+    return pd.Series(score / weight_sum, index=df.index)
 
 
 def _entry_quality_mask(df: pd.DataFrame, thresholds: TriggerThresholds) -> pd.Series:
@@ -219,6 +226,11 @@ def fetch_symbol_bars(symbol: str, period: str, interval: str) -> pd.DataFrame:
         else:
             logger.warning("Price fetch failed for %s after retries: empty response", symbol)
         return pd.DataFrame()
+    return _prepare_bars(hist, resample_rule)
+
+
+def _prepare_bars(hist: pd.DataFrame, resample_rule: str | None) -> pd.DataFrame:
+    """Normalize raw OHLCV history and attach derived indicator columns."""
     if hist.empty:
         return pd.DataFrame()
 
@@ -227,8 +239,8 @@ def fetch_symbol_bars(symbol: str, period: str, interval: str) -> pd.DataFrame:
         if hist.empty:
             return pd.DataFrame()
 
-    bars = hist[["Open", "High", "Low", "Close", "Volume"]].copy()
-    bars.dropna(inplace=True)
+    # dropna() already returns a new frame, so no extra copy of the column selection is needed.
+    bars = hist[["Open", "High", "Low", "Close", "Volume"]].dropna()
     if bars.empty:
         return pd.DataFrame()
 
@@ -239,52 +251,122 @@ def fetch_symbol_bars(symbol: str, period: str, interval: str) -> pd.DataFrame:
     return bars
 
 
+def fetch_all_bars(symbols: List[str], period: str, interval: str) -> Dict[str, pd.DataFrame]:
+    """Fetch OHLCV bars for many symbols with one batched download.
+
+    Symbols missing from the batch response fall back to fetch_symbol_bars(),
+    run concurrently on a small thread pool.
+    """
+    unique = list(dict.fromkeys(s for s in symbols if s))
+    bars_by_symbol: Dict[str, pd.DataFrame] = {}
+    if not unique:
+        return bars_by_symbol
+
+    fetch_interval, resample_rule = _resolve_fetch_interval(interval)
+    try:
+        data = yf.download(
+            tickers=" ".join(unique),
+            period=period,
+            interval=fetch_interval,
+            group_by="ticker",
+            auto_adjust=False,
+            progress=False,
+            threads=True,
+        )
+        if isinstance(data, pd.DataFrame) and not data.empty:
+            multi = data.columns.nlevels > 1
+            for symbol in unique:
+                if multi:
+                    if symbol not in data.columns.get_level_values(0):
+                        continue
+                    hist = data[symbol]
+                elif len(unique) == 1:
+                    hist = data
+                else:
+                    continue
+                bars = _prepare_bars(hist.dropna(how="all"), resample_rule)
+                if not bars.empty:
+                    bars_by_symbol[symbol] = bars
+    except Exception as exc:
+        logger.warning("Batch price download failed for %d symbols: %s", len(unique), exc)
+
+    missing = [s for s in unique if s not in bars_by_symbol]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(FETCH_MAX_WORKERS, len(missing))) as executor:
+            futures = {executor.submit(fetch_symbol_bars, s, period, interval): s for s in missing}
+            for future in as_completed(futures):
+                bars_by_symbol[futures[future]] = future.result()
+    return bars_by_symbol
+
+
 def build_snapshot(symbols: List[str], period: str, interval: str) -> pd.DataFrame:
     """Build one-row-per-symbol snapshot with derived features."""
-    records: List[Dict[str, float]] = []
+    # Column arrays are filled in place (one slot per symbol) and trimmed to the kept rows.
+    columns = {col: np.empty(len(symbols), dtype=float) for col in SNAPSHOT_NUMERIC_COLUMNS}
+    ema20_gt_ema50 = np.empty(len(symbols), dtype=bool)
+    themes: List[str] = []
+    kept: List[str] = []
+    bars_by_symbol = fetch_all_bars(symbols, period=period, interval=interval)
 
     for symbol in symbols:
-        bars = fetch_symbol_bars(symbol, period=period, interval=interval)
+        bars = bars_by_symbol.get(symbol, pd.DataFrame())
         if bars.empty or len(bars) < 60:
             logger.debug("Skipping %s due to insufficient bars", symbol)
             continue
 
-        last = bars.iloc[-1]
-        prev = bars.iloc[-2]
-        prev4 = bars.iloc[-5] if len(bars) >= 5 else prev
-        vol_mean20 = bars["Volume"].tail(20).mean()
-        atr_pct_mean20 = bars["ATR_PCT"].tail(20).mean()
-        range_high20 = bars["High"].iloc[-21:-1].max()
-
-        ret_1 = (last["Close"] / prev["Close"] - 1.0) * 100.0 if prev["Close"] > 0 else 0.0
-        ret_4 = (last["Close"] / prev4["Close"] - 1.0) * 100.0 if prev4["Close"] > 0 else 0.0
-        volume_ratio = last["Volume"] / vol_mean20 if vol_mean20 > 0 else 0.0
-        atr_pct = float(last["ATR_PCT"]) if pd.notna(last["ATR_PCT"]) else 0.0
+        # Pull each column out once and read the tail as plain floats.
+        close = bars["Close"].to_numpy(dtype=float)
+        volume = bars["Volume"].to_numpy(dtype=float)
+        high = bars["High"].to_numpy(dtype=float)
+        atr_series = bars["ATR_PCT"].to_numpy(dtype=float)
+        last_close = float(close[-1])
+        prev_close = float(close[-2])
+        prev4_close = float(close[-5]) if len(close) >= 5 else prev_close
+        last_volume = float(volume[-1])
+        ema20 = float(bars["EMA20"].iat[-1])
+        ema50 = float(bars["EMA50"].iat[-1])
+        vol_mean20 = float(volume[-20:].mean())
+        atr_tail = atr_series[-20:]
+        atr_tail = atr_tail[~np.isnan(atr_tail)]
+        atr_pct_mean20 = float(atr_tail.mean()) if atr_tail.size else np.nan
+        range_high20 = float(high[-21:-1].max())
+
+        ret_1 = (last_close / prev_close - 1.0) * 100.0 if prev_close > 0 else 0.0
+        ret_4 = (last_close / prev4_close - 1.0) * 100.0 if prev4_close > 0 else 0.0
+        volume_ratio = last_volume / vol_mean20 if vol_mean20 > 0 else 0.0
+        atr_pct = float(atr_series[-1]) if not np.isnan(atr_series[-1]) else 0.0
         atr_expansion = (atr_pct / atr_pct_mean20) if atr_pct_mean20 and not np.isnan(atr_pct_mean20) else 0.0
-        trend_gap = (last["EMA20"] / last["EMA50"] - 1.0) * 100.0 if last["EMA50"] > 0 else 0.0
-        breakout_pct = (last["Close"] / range_high20 - 1.0) * 100.0 if range_high20 and range_high20 > 0 else -999.0
-
-        records.append(
-            {
-                "symbol": symbol,
-                "close": float(last["Close"]),
-                "volume": float(last["Volume"]),
-                "amount": float(last["Amount"]),
-                "ret_1_pct": float(ret_1),
-                "ret_4_pct": float(ret_4),
-                "volume_ratio_20": float(volume_ratio),
-                "atr_pct": float(atr_pct),
-                "atr_expansion": float(atr_expansion),
-                "trend_gap_pct": float(trend_gap),
-                "breakout_pct": float(breakout_pct),
-                "ema20_gt_ema50": bool(last["EMA20"] > last["EMA50"]),
-                "theme": classify_symbol_theme(symbol),
-            }
+        trend_gap = (ema20 / ema50 - 1.0) * 100.0 if ema50 > 0 else 0.0
+        breakout_pct = (last_close / range_high20 - 1.0) * 100.0 if range_high20 and range_high20 > 0 else -999.0
+
+        row = (
+            last_close,
+            last_volume,
+            float(bars["Amount"].iat[-1]),
+            ret_1,
+            ret_4,
+            volume_ratio,
+            atr_pct,
+            atr_expansion,
+            trend_gap,
+            breakout_pct,
         )
-
-    if not records:
+        i = len(kept)
+        for col, value in zip(SNAPSHOT_NUMERIC_COLUMNS, row):
+            columns[col][i] = value
+        ema20_gt_ema50[i] = ema20 > ema50
+        themes.append(classify_symbol_theme(symbol))
+        kept.append(symbol)
+
+    if not kept:
         return pd.DataFrame()
-    return pd.DataFrame.from_records(records).set_index("symbol")
+    n = len(kept)
+    data = {col: values[:n] for col, values in columns.items()}
+    data["ema20_gt_ema50"] = ema20_gt_ema50[:n]
+    data["theme"] = themes
+    snapshot = pd.DataFrame(data, index=pd.Index(kept, name="symbol"))
+    snapshot.attrs["atr_expansion_median"] = float(np.nanmedian(data["atr_expansion"]))
+    return snapshot
 
 
 def trigger_volume_momentum(snapshot: pd.DataFrame, thresholds: TriggerThresholds, top_n: int = 10) -> pd.DataFrame:
@@ -292,7 +374,7 @@ def trigger_volume_momentum(snapshot: pd.DataFrame, thresholds: TriggerThreshold
     if snapshot.empty:
         return pd.DataFrame()
 
-    df = snapshot.copy()
+    df = snapshot
     cond = (
         (df["volume_ratio_20"] >= thresholds.volume_momentum_volume_ratio_min)
         & (df["ret_1_pct"] >= thresholds.volume_momentum_ret_1_min_pct)
@@ -303,7 +385,7 @@ def trigger_volume_momentum(snapshot: pd.DataFrame, thresholds: TriggerThreshold
     if df.empty:
         return df
 
-    df["composite_score"] = _normalize_score(
+    score = _normalize_score(
         df,
         cols=[
             ("volume_ratio_20", 0.45),
@@ -311,7 +393,8 @@ def trigger_volume_momentum(snapshot: pd.DataFrame, thresholds: TriggerThreshold
             ("amount", 0.20),
         ],
     )
-    return df.sort_values("composite_score", ascending=False).head(top_n)
+    # Partial top-N selection instead of a full sort.
+    return df.assign(composite_score=score).nlargest(top_n, "composite_score")
 
 
 def trigger_volatility_trend(snapshot: pd.DataFrame, thresholds: TriggerThresholds, top_n: int = 10) -> pd.DataFrame:
@@ -319,7 +402,7 @@ def trigger_volatility_trend(snapshot: pd.DataFrame, thresholds: TriggerThreshol
     if snapshot.empty:
         return pd.DataFrame()
 
-    df = snapshot.copy()
+    df = snapshot
     cond = (
         (df["atr_expansion"] >= 1.0)
         & (df["ret_4_pct"] >= thresholds.volatility_trend_ret_4_min_pct)
@@ -330,7 +413,7 @@ def trigger_volatility_trend(snapshot: pd.DataFrame, thresholds: TriggerThreshol
     if df.empty:
         return df
 
-    df["composite_score"] = _normalize_score(
+    score = _normalize_score(
         df,
         cols=[
             ("atr_expansion", 0.40),
@@ -338,7 +421,8 @@ def trigger_volatility_trend(snapshot: pd.DataFrame, thresholds: TriggerThreshol
             ("amount", 0.25),
         ],
     )
-    return df.sort_values("composite_score", ascending=False).head(top_n)
+    # Partial top-N selection instead of a full sort.
+    return df.assign(composite_score=score).nlargest(top_n, "composite_score")
 
 
 def trigger_range_breakout(snapshot: pd.DataFrame, thresholds: TriggerThresholds, top_n: int = 10) -> pd.DataFrame:
@@ -346,7 +430,7 @@ def trigger_range_breakout(snapshot: pd.DataFrame, thresholds: TriggerThresholds
     if snapshot.empty:
         return pd.DataFrame()
 
-    df = snapshot.copy()
+    df = snapshot
     cond = (
         (df["breakout_pct"] >= -0.05)
         & (df["volume_ratio_20"] >= thresholds.range_breakout_volume_ratio_min)
@@ -357,7 +441,7 @@ def trigger_range_breakout(snapshot: pd.DataFrame, thresholds: TriggerThresholds
     if df.empty:
         return df
 
-    df["composite_score"] = _normalize_score(
+    score = _normalize_score(
         df,
         cols=[
             ("breakout_pct", 0.45),
@@ -365,7 +449,8 @@ def trigger_range_breakout(snapshot: pd.DataFrame, thresholds: TriggerThresholds
             ("amount", 0.20),
         ],
     )
-    return df.sort_values("composite_score", ascending=False).head(top_n)
+    # Partial top-N selection instead of a full sort.
+    return df.assign(composite_score=score).nlargest(top_n, "composite_score")
 
 
 def calculate_agent_fit_metrics(row: pd.Series, thresholds: TriggerThresholds) -> Dict[str, float]:
@@ -409,9 +494,28 @@ def score_candidates_by_agent_criteria(df: pd.DataFrame, thresholds: TriggerThre
     if df.empty:
         return df
 
-    out = df.copy()
-    metrics = out.apply(lambda row: calculate_agent_fit_metrics(row, thresholds), axis=1, result_type="expand")
-    return pd.concat([out, metrics], axis=1)
+    # Column-wise version of calculate_agent_fit_metrics() over all candidates at once.
+    price = df["close"].to_numpy(dtype=float)
+    atr_pct = np.maximum(df["atr_pct"].to_numpy(dtype=float), 0.0)
+    volume_ratio = np.maximum(df["volume_ratio_20"].to_numpy(dtype=float), 0.0)
+
+    stop_min = min(thresholds.stop_loss_min_pct, thresholds.stop_loss_max_pct)
+    stop_max = max(thresholds.stop_loss_min_pct, thresholds.stop_loss_max_pct)
+    stop_loss_pct = np.clip(thresholds.stop_loss_atr_multiplier * atr_pct, stop_min, stop_max)
+    target_pct = np.maximum(thresholds.target_to_stop_ratio * stop_loss_pct, thresholds.target_min_pct)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        risk_reward_ratio = np.where(stop_loss_pct > 0, target_pct / stop_loss_pct, 0.0)
+
+    rr_score = np.minimum(risk_reward_ratio / 2.0, 1.0)
+    liq_score = np.minimum(volume_ratio / 2.5, 1.0)
+    return df.assign(
+        stop_loss_price=price * (1.0 - stop_loss_pct),
+        target_price=price * (1.0 + target_pct),
+        stop_loss_pct=stop_loss_pct,
+        target_pct=target_pct,
+        risk_reward_ratio=risk_reward_ratio,
+        agent_fit_score=rr_score * 0.65 + liq_score * 0.35,
+    )
 
 
 def select_final_symbols(
@@ -440,7 +544,8 @@ def select_final_symbols(
     if not trigger_candidates:
         return {}
 
-    final: Dict[str, pd.DataFrame] = {}
+    # Collect picked symbols per trigger and slice each trigger frame once at the end.
+    picks: Dict[str, List[str]] = {}
     selected: set[str] = set()
 
     # First pass: one unique symbol per trigger.
@@ -448,33 +553,31 @@ def select_final_symbols(
         for symbol in df.index:
             if symbol in selected:
                 continue
-            final[trigger_name] = df.loc[[symbol]]
+            picks[trigger_name] = [symbol]
             selected.add(symbol)
             break
         if len(selected) >= max_positions:
-            return final
+            break
 
-    # Second pass: fill by global final_score.
-    pool: List[Tuple[str, str, float]] = []
-    for trigger_name, df in trigger_candidates.items():
-        for symbol in df.index:
+    if len(selected) < max_positions:
+        # Second pass: fill by global final_score.
+        pool: List[Tuple[str, str, float]] = []
+        for trigger_name, df in trigger_candidates.items():
+            for symbol, score in df["final_score"].items():
+                if symbol in selected:
+                    continue
+                pool.append((trigger_name, symbol, float(score)))
+        pool.sort(key=lambda x: x[2], reverse=True)
+
+        for trigger_name, symbol, _ in pool:
+            if len(selected) >= max_positions:
+                break
             if symbol in selected:
                 continue
-            pool.append((trigger_name, symbol, float(df.loc[symbol, "final_score"])))
-    pool.sort(key=lambda x: x[2], reverse=True)
-
-    for trigger_name, symbol, _ in pool:
-        if len(selected) >= max_positions:
-            break
-        if symbol in selected:
-            continue
-        if trigger_name in final:
-            final[trigger_name] = pd.concat([final[trigger_name], trigger_candidates[trigger_name].loc[[symbol]]])
-        else:
-            final[trigger_name] = trigger_candidates[trigger_name].loc[[symbol]]
-        selected.add(symbol)
+            picks.setdefault(trigger_name, []).append(symbol)
+            selected.add(symbol)
 
-    return final
+    return {name: trigger_candidates[name].loc[symbols] for name, symbols in picks.items()}
 
 
 def fallback_candidates(snapshot: pd.DataFrame, top_n: int = 3) -> pd.DataFrame:
@@ -482,13 +585,13 @@ def fallback_candidates(snapshot: pd.DataFrame, top_n: int = 3) -> pd.DataFrame:
     if snapshot.empty:
         return pd.DataFrame()
 
-    df = snapshot.copy()
+    df = snapshot
     # Prefer trend-aligned and sufficiently liquid symbols first.
-    preferred = df[(df["ema20_gt_ema50"]) & (df["volume_ratio_20"] >= 1.0) & (df["atr_pct"] <= 0.09)].copy()
+    preferred = df[(df["ema20_gt_ema50"]) & (df["volume_ratio_20"] >= 1.0) & (df["atr_pct"] <= 0.09)]
     if preferred.empty:
-        preferred = df.copy()
+        preferred = df
 
-    preferred["composite_score"] = _normalize_score(
+    score = _normalize_score(
         preferred,
         cols=[
             ("amount", 0.45),
@@ -497,7 +600,7 @@ def fallback_candidates(snapshot: pd.DataFrame, top_n: int = 3) -> pd.DataFrame:
             ("trend_gap_pct", 0.10),
         ],
     )
-    return preferred.sort_values("composite_score", ascending=False).head(top_n)
+    return preferred.assign(composite_score=score).sort_values("composite_score", ascending=False).head(top_n)
 
 
 def _build_output(final_results: Dict[str, pd.DataFrame], metadata: Dict[str, str]) -> Dict:
@@ -507,8 +610,8 @@ def _build_output(final_results: Dict[str, pd.DataFrame], metadata: Dict[str, st
         if df.empty:
             continue
         items = []
-        for symbol in df.index:
-            r = df.loc[symbol]
+        # One bulk conversion to plain dicts instead of a .loc row Series per symbol.
+        for symbol, r in zip(df.index, df.to_dict(orient="records")):
             items.append(
                 {
                     "symbol": symbol,
@@ -552,9 +655,11 @@ def run_batch(
     logger.setLevel(numeric_level)
     _handler.setLevel(numeric_level)
 
+    # Normalize once and drop duplicates (keeping order) so each symbol is fetched and scored once.
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
     excluded = {s.strip().upper() for s in (exclude_symbols or []) if s and s.strip()}
     if excluded:
-        symbols = [s for s in symbols if s.upper() not in excluded]
+        symbols = [s for s in symbols if s not in excluded]
         logger.info("Excluded held symbols from phase1 universe: %d", len(excluded))
 
     logger.info("Crypto trigger batch started: interval=%s period=%s symbols=%d", interval, period, len(symbols))
@@ -572,7 +677,7 @@ def run_batch(
         thresholds.volatility_trend_ret_4_min_pct,
         thresholds.range_breakout_volume_ratio_min,
         thresholds.volatility_tightening_factor,
-        float(snapshot["atr_expansion"].median()),
+        _atr_expansion_median(snapshot),
     )
 
     triggers = {
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 from typing import Dict
 
 
@@ -33,6 +34,7 @@ THEME_MAP: Dict[str, str] = {
 }
 
 
+@functools.lru_cache(maxsize=4096)
 def classify_symbol_theme(symbol: str) -> str:
     """Classify symbol to a broad crypto theme.
 
@@ -1,7 +1,7 @@
 """Crypto tracking helpers and database schema."""
 
 from .db_schema import (
-    add_theme_columns_if_missing,
+    add_missing_columns,
     create_crypto_tables,
     create_crypto_indexes,
     get_crypto_holdings_count,
@@ -11,7 +11,7 @@ from .db_schema import (
 __all__ = [
     "create_crypto_tables",
     "create_crypto_indexes",
-    "add_theme_columns_if_missing",
+    "add_missing_columns",
     "get_crypto_holdings_count",
     "is_crypto_symbol_in_holdings",
 ]
@@ -1,6 +1,7 @@
 """Database schema for crypto tracking (Phase 2)."""
 
 import logging
+from typing import Dict, Set
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +12,7 @@ CREATE TABLE IF NOT EXISTS crypto_holdings (
     asset_name TEXT NOT NULL,          -- BTC, ETH...
     buy_price REAL NOT NULL,           -- USD
     buy_date TEXT NOT NULL,
+    buy_ts REAL,                       -- buy time as epoch seconds (avoids re-parsing buy_date)
     quantity REAL,                     -- fractional size for crypto
     notional_usd REAL,                 -- order notional
     current_price REAL,
@@ -154,6 +156,16 @@ CREATE TABLE IF NOT EXISTS crypto_order_executions (
 """
 
 
+TABLE_CRYPTO_SCENARIO_CACHE = """
+CREATE TABLE IF NOT EXISTS crypto_scenario_cache (
+    cache_key TEXT PRIMARY KEY,        -- sha256(model, prompt version, symbol, trigger, features)
+    symbol TEXT NOT NULL,
+    scenario TEXT NOT NULL,            -- JSON (raw LLM scenario)
+    created_at TEXT NOT NULL
+)
+"""
+
+
 CRYPTO_INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_crypto_holdings_theme ON crypto_holdings(theme)",
     "CREATE INDEX IF NOT EXISTS idx_crypto_holdings_trigger ON crypto_holdings(trigger_type)",
@@ -169,40 +181,55 @@ CRYPTO_INDEXES = [
 ]
 
 
+CRYPTO_TABLES = [
+    ("crypto_holdings", TABLE_CRYPTO_HOLDINGS),
+    ("crypto_trading_history", TABLE_CRYPTO_TRADING_HISTORY),
+    ("crypto_watchlist_history", TABLE_CRYPTO_WATCHLIST_HISTORY),
+    ("crypto_analysis_performance_tracker", TABLE_CRYPTO_PERFORMANCE_TRACKER),
+    ("crypto_holding_decisions", TABLE_CRYPTO_HOLDING_DECISIONS),
+    ("crypto_order_executions", TABLE_CRYPTO_ORDER_EXECUTIONS),
+    ("crypto_scenario_cache", TABLE_CRYPTO_SCENARIO_CACHE),
+]
+
+# Whole DDL batches, so bootstrap is one executescript() call instead of a round-trip per statement.
+CRYPTO_TABLES_SCRIPT = ";\n".join(table_sql.strip() for _, table_sql in CRYPTO_TABLES) + ";"
+# Indexes no longer read by any query; dropped so they stop costing writes.
+CRYPTO_OBSOLETE_INDEXES = [
+    "DROP INDEX IF EXISTS idx_crypto_history_symbol_sell_date",
+]
+CRYPTO_INDEXES_SCRIPT = ";\n".join(CRYPTO_INDEXES + CRYPTO_OBSOLETE_INDEXES) + ";"
+
+
 def create_crypto_tables(cursor, conn):
-    tables = [
-        ("crypto_holdings", TABLE_CRYPTO_HOLDINGS),
-        ("crypto_trading_history", TABLE_CRYPTO_TRADING_HISTORY),
-        ("crypto_watchlist_history", TABLE_CRYPTO_WATCHLIST_HISTORY),
-        ("crypto_analysis_performance_tracker", TABLE_CRYPTO_PERFORMANCE_TRACKER),
-        ("crypto_holding_decisions", TABLE_CRYPTO_HOLDING_DECISIONS),
-        ("crypto_order_executions", TABLE_CRYPTO_ORDER_EXECUTIONS),
-    ]
-    for table_name, table_sql in tables:
-        cursor.execute(table_sql)
-        logger.info("Created/verified table: %s", table_name)
+    cursor.executescript(CRYPTO_TABLES_SCRIPT)
     conn.commit()
+    logger.info("Created/verified %d crypto tables", len(CRYPTO_TABLES))
 
 
 def create_crypto_indexes(cursor, conn):
-    for index_sql in CRYPTO_INDEXES:
-        cursor.execute(index_sql)
+    cursor.executescript(CRYPTO_INDEXES_SCRIPT)
     conn.commit()
 
 
-def add_theme_columns_if_missing(cursor, conn):
-    """Add theme columns to tables created before Phase 2.5."""
+def add_missing_columns(cursor, conn):
+    """Add columns missing from older tables (theme from Phase 2.5, holdings buy_ts)."""
     migrations = [
         ("crypto_watchlist_history", "theme TEXT"),
         ("crypto_analysis_performance_tracker", "theme TEXT"),
+        ("crypto_holdings", "buy_ts REAL"),
     ]
+    existing: Dict[str, Set[str]] = {}
     for table_name, column_def in migrations:
-        try:
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_def}")
-            conn.commit()
-            logger.info("Added column to %s: %s", table_name, column_def)
-        except Exception:
-            pass
+        if table_name not in existing:
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            existing[table_name] = {row[1] for row in cursor.fetchall()}
+        column_name = column_def.split()[0]
+        if column_name in existing[table_name]:
+            continue
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_def}")
+        conn.commit()
+        existing[table_name].add(column_name)
+        logger.info("Added column to %s: %s", table_name, column_def)
 
 
 def get_crypto_holdings_count(cursor) -> int:
@@ -211,7 +238,7 @@ def get_crypto_holdings_count(cursor) -> int:
 
 
 def is_crypto_symbol_in_holdings(cursor, symbol: str) -> bool:
-    cursor.execute("SELECT COUNT(*) FROM crypto_holdings WHERE symbol = ?", (symbol,))
-    return cursor.fetchone()[0] > 0
+    cursor.execute("SELECT 1 FROM crypto_holdings WHERE symbol = ? LIMIT 1", (symbol,))
+    return cursor.fetchone() is not None
 
 
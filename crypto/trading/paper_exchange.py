@@ -5,7 +5,7 @@ from __future__ import annotations
 import logging
 import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import yfinance as yf
 
@@ -61,6 +61,46 @@ class PaperCryptoTrading:
             logger.warning("Paper price fetch failed for %s after retries: %s", symbol, last_error)
         return 0.0
 
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Fetch latest prices for many symbols with one batched download.
+
+        Symbols missing from the batch response fall back to get_current_price().
+        Symbols whose price cannot be resolved are omitted from the result.
+        """
+        unique = list(dict.fromkeys(s for s in symbols if s))
+        prices: Dict[str, float] = {}
+        if not unique:
+            return prices
+
+        try:
+            data = yf.download(
+                tickers=unique,
+                period="1d",
+                interval="1m",
+                group_by="ticker",
+                auto_adjust=False,
+                progress=False,
+                threads=True,
+            )
+            if data is not None and not data.empty:
+                multi = getattr(data.columns, "nlevels", 1) > 1
+                for symbol in unique:
+                    try:
+                        closes = (data[symbol]["Close"] if multi else data["Close"]).dropna()
+                    except KeyError:
+                        continue
+                    if not closes.empty and float(closes.iloc[-1]) > 0:
+                        prices[symbol] = float(closes.iloc[-1])
+        except Exception as e:
+            logger.warning("Batch price download failed for %d symbols: %s", len(unique), e)
+
+        for symbol in unique:
+            if symbol not in prices:
+                price = self.get_current_price(symbol)
+                if price > 0:
+                    prices[symbol] = price
+        return prices
+
     def _record_execution(
         self,
         symbol: str,
@@ -109,8 +149,11 @@ class PaperCryptoTrading:
         quote_amount: float,
         limit_price: Optional[float] = None,
         metadata: Optional[Dict[str, Any]] = None,
+        market_price: Optional[float] = None,
     ) -> Dict[str, Any]:
-        market_price = self.get_current_price(symbol)
+        """Paper market/limit buy. `market_price` lets callers pass a freshly batched quote."""
+        if not market_price or market_price <= 0:
+            market_price = self.get_current_price(symbol)
         if market_price <= 0:
             order_id = self._record_execution(
                 symbol=symbol,
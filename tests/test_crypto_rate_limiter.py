@@ -0,0 +1,185 @@
+"""Tests for the crypto LLM rate limiter (patched clock, no real waiting)."""
+
+import asyncio
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto.cores import rate_limiter
+from crypto.cores.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    AsyncRateLimiter,
+    is_rate_limit_error,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    """Stands in for the module's time/asyncio: sleep() advances monotonic() instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(
+        rate_limiter,
+        "asyncio",
+        types.SimpleNamespace(Lock=asyncio.Lock, Condition=asyncio.Condition, sleep=fake.sleep),
+    )
+    return fake
+
+
+class HTTPError(Exception):
+    def __init__(self, message="", status_code=None, headers=None):
+        super().__init__(message)
+        if status_code is not None:
+            self.status_code = status_code
+        self.response = types.SimpleNamespace(headers=headers or {}, status_code=status_code)
+
+
+class RateLimitError(Exception):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_rpm_window_blocks_until_oldest_request_expires(clock):
+    limiter = AsyncRateLimiter(rpm=2, window_seconds=60.0)
+    await limiter.acquire()
+    clock.now += 10.0
+    await limiter.acquire()
+    assert clock.sleeps == []
+
+    start = clock.now
+    await limiter.acquire()
+    # The first request leaves the window 60s after it was made.
+    assert clock.now - start == pytest.approx(50.0)
+
+
+@pytest.mark.asyncio
+async def test_tpm_window_counts_tokens(clock):
+    limiter = AsyncRateLimiter(tpm=100, window_seconds=60.0)
+    await limiter.acquire(60)
+    await limiter.acquire(40)
+    assert clock.sleeps == []
+
+    start = clock.now
+    await limiter.acquire(1)
+    assert clock.now - start == pytest.approx(60.0)
+
+
+@pytest.mark.asyncio
+async def test_tpm_oversized_request_is_clamped(clock):
+    limiter = AsyncRateLimiter(tpm=100, window_seconds=60.0)
+    await limiter.acquire(10_000)
+    assert clock.sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_zero_limits_disable_limiting(clock):
+    limiter = AsyncRateLimiter(rpm=0, tpm=0)
+    for _ in range(50):
+        await limiter.acquire(10_000)
+    assert clock.sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_penalize_blocks_new_acquisitions(clock):
+    limiter = AsyncRateLimiter(rpm=100)
+    limiter.penalize(5.0)
+    start = clock.now
+    await limiter.acquire()
+    assert clock.now - start == pytest.approx(5.0)
+
+    # A shorter penalty never cuts an active one short.
+    limiter.penalize(10.0)
+    limiter.penalize(1.0)
+    start = clock.now
+    await limiter.acquire()
+    assert clock.now - start == pytest.approx(10.0)
+
+
+def test_retry_after_seconds_reads_header():
+    assert retry_after_seconds(HTTPError(headers={"retry-after": "7"}), default=2.0) == 7.0
+    assert retry_after_seconds(HTTPError(headers={"retry-after": "1.5"}), default=2.0) == 1.5
+    assert retry_after_seconds(HTTPError(headers={"retry-after": "-3"}), default=2.0) == 0.0
+
+
+def test_retry_after_seconds_falls_back_to_default():
+    assert retry_after_seconds(HTTPError(headers={}), default=2.0) == 2.0
+    assert retry_after_seconds(HTTPError(headers={"retry-after": "soon"}), default=4.0) == 4.0
+    assert retry_after_seconds(ValueError("no response"), default=8.0) == 8.0
+
+
+def test_is_rate_limit_error():
+    assert is_rate_limit_error(HTTPError(status_code=429))
+    assert is_rate_limit_error(RateLimitError("slow down"))
+    assert not is_rate_limit_error(HTTPError(status_code=500))
+    # Text that merely contains "429" is not a rate limit.
+    assert not is_rate_limit_error(ValueError("request id 4291 failed on port 8429"))
+
+    try:
+        try:
+            raise HTTPError(status_code=429)
+        except HTTPError as inner:
+            raise RuntimeError("LLM call failed") from inner
+    except RuntimeError as wrapped:
+        assert is_rate_limit_error(wrapped)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_shrinks_on_429_and_recovers():
+    limiter = AdaptiveConcurrencyLimiter(8, recovery_successes=2)
+    with pytest.raises(RateLimitError):
+        async with limiter:
+            raise RateLimitError()
+    assert limiter.limit == 4
+
+    with pytest.raises(ValueError):
+        async with limiter:
+            raise ValueError("not a rate limit")
+    assert limiter.limit == 4
+
+    for _ in range(4):
+        async with limiter:
+            pass
+    assert limiter.limit == 6
+
+    for _ in range(20):
+        async with limiter:
+            pass
+    assert limiter.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_caps_in_flight_calls():
+    limiter = AdaptiveConcurrencyLimiter(3, recovery_successes=1000)
+    in_flight = 0
+    peak = 0
+
+    async def call():
+        nonlocal in_flight, peak
+        async with limiter:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+
+    await asyncio.gather(*[call() for _ in range(10)])
+    assert peak == 3
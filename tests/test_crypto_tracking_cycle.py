@@ -0,0 +1,116 @@
+"""Tests for the crypto tracking agent's candidate cycle (stubbed LLM, temporary SQLite DB)."""
+
+import asyncio
+import importlib
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="module")
+def agent_module(tmp_path_factory):
+    # Importing the agent configures a dated log file in the working directory.
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("crypto_tracking"))
+    try:
+        return importlib.import_module("crypto.crypto_tracking_agent")
+    finally:
+        os.chdir(cwd)
+
+
+def _make_full_agent(agent_module, tmp_path, monkeypatch, concurrency):
+    """Agent with every slot already held; holdings refresh is skipped."""
+    from crypto.tracking import create_crypto_indexes, create_crypto_tables
+
+    monkeypatch.setenv("CRYPTO_LLM_CONCURRENCY", str(concurrency))
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = agent_module.CryptoTrackingAgent(db_path=str(tmp_path / "tracking.sqlite"))
+    agent.conn = sqlite3.connect(agent.db_path)
+    agent.conn.row_factory = sqlite3.Row
+    agent.cursor = agent.conn.cursor()
+    create_crypto_tables(agent.cursor, agent.conn)
+    create_crypto_indexes(agent.cursor, agent.conn)
+    for i in range(agent.max_slots):
+        agent.cursor.execute(
+            "INSERT INTO crypto_holdings (symbol, asset_name, buy_price, buy_date) VALUES (?, ?, 100, '2026-01-01 00:00:00')",
+            (f"H{i}-USD", f"H{i}"),
+        )
+    agent.conn.commit()
+
+    async def no_sells():
+        return 0
+
+    monkeypatch.setattr(agent, "update_holdings", no_sells)
+    return agent
+
+
+def _write_candidates(tmp_path, count):
+    path = tmp_path / "candidates.json"
+    items = [
+        {"symbol": f"N{i}-USD", "current_price": 100, "final_score": 0.9, "risk_reward_ratio": 3.0}
+        for i in range(count)
+    ]
+    path.write_text(json.dumps({"metadata": {}, "Volume Momentum": items}), encoding="utf-8")
+    return str(path)
+
+
+def _watchlist_reasons(agent):
+    return [row[0] for row in agent.cursor.execute("SELECT skip_reason FROM crypto_watchlist_history ORDER BY id")]
+
+
+@pytest.mark.asyncio
+async def test_full_book_wave_is_analyzed_concurrently(agent_module, tmp_path, monkeypatch):
+    agent = _make_full_agent(agent_module, tmp_path, monkeypatch, concurrency=8)
+    in_flight = 0
+    peak = 0
+    analyzed = []
+
+    async def fake_analyze(symbol, trigger_type, candidate):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        analyzed.append(symbol)
+        return {"decision": "no_entry", "buy_score": 4, "min_score": 6}
+
+    monkeypatch.setattr(agent, "analyze_candidate", fake_analyze)
+    result = await agent.process_candidates_file(_write_candidates(tmp_path, 6))
+
+    assert result == (0, 6, 0)
+    assert sorted(analyzed) == [f"N{i}-USD" for i in range(6)]
+    # A full book (capacity 1) still fans the wave out up to the LLM concurrency limit.
+    assert peak == 6
+    assert all(reason.startswith("decision=no_entry") for reason in _watchlist_reasons(agent))
+    agent.conn.close()
+
+
+@pytest.mark.asyncio
+async def test_tail_skips_analysis_once_rotation_budget_is_spent(agent_module, tmp_path, monkeypatch):
+    agent = _make_full_agent(agent_module, tmp_path, monkeypatch, concurrency=2)
+    analyzed = []
+
+    async def fake_analyze(symbol, trigger_type, candidate):
+        analyzed.append(symbol)
+        return {"decision": "entry", "buy_score": 9, "min_score": 6}
+
+    async def fake_rotation(**kwargs):
+        return True, "rotated", 1
+
+    monkeypatch.setattr(agent, "analyze_candidate", fake_analyze)
+    monkeypatch.setattr(agent, "_try_rotation_entry", fake_rotation)
+    result = await agent.process_candidates_file(_write_candidates(tmp_path, 5))
+
+    assert result == (1, 4, 1)
+    # First wave (LLM concurrency 2) is analyzed; the rest never reach the LLM.
+    assert analyzed == ["N0-USD", "N1-USD"]
+    reasons = _watchlist_reasons(agent)
+    assert reasons[0].startswith("max slots reached")
+    assert all(reason.startswith("analysis skipped:") for reason in reasons[1:])
+    assert len(reasons) == 4
+    agent.conn.close()
@@ -0,0 +1,81 @@
+"""Tests for the crypto tracking agent's LLM JSON extraction (no LLM or network needed)."""
+
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="module")
+def agent_module(tmp_path_factory):
+    # Importing the agent configures a dated log file in the working directory.
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("crypto_tracking"))
+    try:
+        return importlib.import_module("crypto.crypto_tracking_agent")
+    finally:
+        os.chdir(cwd)
+
+
+def test_extract_nested_braces(agent_module):
+    text = '{"a": {"b": {"c": 1}}, "d": [1, {"e": 2}]}'
+    assert agent_module._extract_first_json_object(text) == text
+
+
+def test_extract_braces_inside_strings(agent_module):
+    text = '{"rationale": "range {low} to {high}}", "buy_score": 7}'
+    block = agent_module._extract_first_json_object(text)
+    assert block == text
+    assert json.loads(block)["rationale"] == "range {low} to {high}}"
+
+
+def test_extract_escaped_quotes(agent_module):
+    text = r'{"note": "said \"hold {now}\" twice", "decision": "entry"} trailing'
+    block = agent_module._extract_first_json_object(text)
+    assert block == r'{"note": "said \"hold {now}\" twice", "decision": "entry"}'
+    assert json.loads(block)["decision"] == "entry"
+
+
+def test_extract_with_leading_prose(agent_module):
+    text = 'Sure! Here is the "scenario":\n```json\n{"buy_score": 8, "min_score": 6}\n```\nThen {"second": 1}'
+    assert agent_module._extract_first_json_object(text) == '{"buy_score": 8, "min_score": 6}'
+
+
+def test_extract_without_object(agent_module):
+    assert agent_module._extract_first_json_object("no json here") is None
+    assert agent_module._extract_first_json_object("") is None
+    assert agent_module._extract_first_json_object('{"unterminated": {"x": 1}') is None
+
+
+def test_parse_json_object(agent_module):
+    assert agent_module._parse_json_object('prose {"decision": "Entry"} more') == {"decision": "Entry"}
+    assert agent_module._parse_json_object("{not json}") == {}
+    assert agent_module._parse_json_object("") == {}
+
+
+def test_parse_json_object_skips_non_json_brace_blocks(agent_module):
+    text = (
+        "Template was {symbol} -> {decision}, e.g. `if (x) { return y; }`.\n"
+        '```json\n{"decision": "entry", "buy_score": 8}\n```'
+    )
+    assert agent_module._parse_json_object(text) == {"decision": "entry", "buy_score": 8}
+
+
+def test_parse_json_object_skips_stray_open_brace(agent_module):
+    text = 'Levels: support { 95 and resistance 110.\n{"decision": "no_entry"}'
+    assert agent_module._parse_json_object(text) == {"decision": "no_entry"}
+
+
+def test_scenario_cache_key_varies_by_language_and_prompt(agent_module):
+    candidate = {"current_price": 100.0, "final_score": 0.6, "theme": "Major"}
+    fingerprint = agent_module._scenario_prompt_fingerprint("instruction v1")
+    key = agent_module._scenario_cache_key("BTC-USD", "breakout", candidate, "ko", fingerprint)
+
+    assert key == agent_module._scenario_cache_key("BTC-USD", "breakout", dict(candidate), "ko", fingerprint)
+    assert key != agent_module._scenario_cache_key("BTC-USD", "breakout", candidate, "en", fingerprint)
+    changed = agent_module._scenario_prompt_fingerprint("instruction v2")
+    assert key != agent_module._scenario_cache_key("BTC-USD", "breakout", candidate, "ko", changed)